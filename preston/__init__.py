@@ -1,4 +1,7 @@
 from .preston import Preston  # noqa
+from .scheduler import RequestScheduler  # noqa
+from .tracing import JsonLinesExporter, SpanTracer, Tracer  # noqa
+from .validation import ParameterError  # noqa
 
 
 __author__ = "Matt Boulanger"
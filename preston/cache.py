@@ -1,23 +1,45 @@
 from datetime import datetime, UTC
+import hashlib
+import json
 import math
+import os
+import struct
 import time
-from typing import Optional
+import zlib
+from typing import Any, BinaryIO, Optional
 
 
 class Cache:
-    def __init__(self):
+    SNAPSHOT_MAGIC = b"PRESTON-CACHE-1\n"
+    # expires_in, expires_after, pages, encoding, url, etag and payload lengths
+    SNAPSHOT_RECORD = struct.Struct("<ddIBIII")
+    SNAPSHOT_ENCODINGS = [None, "json", "zlib"]
+
+    def __init__(self, compact: bool = False, compress: bool = False):
         """Cache class.
 
         The cache is designed to respect the caching rules of ESI as to
         not request a page more often than it is updated by the server.
 
+        By default, pages are kept as the decoded Python objects. With `compact`,
+        pages are stored as serialized JSON bytes instead (and with `compress`,
+        as zlib-compressed bytes), and decoded again on every `check`. This
+        trades a small decode cost on hits for a much smaller memory footprint.
+
         Args:
-            None
+            compact: store pages as JSON bytes
+            compress: store pages as zlib-compressed JSON bytes (implies compact)
 
         Returns:
             None
         """
         self.data: dict = {}
+        if compress:
+            self.encoding = SavedEndpoint.ENCODING_ZLIB
+        elif compact:
+            self.encoding = SavedEndpoint.ENCODING_JSON
+        else:
+            self.encoding = None
 
     def _get_expiration(self, headers: dict) -> int:
         """Gets the expiration time of the data from the response headers.
@@ -48,7 +70,13 @@ class Cache:
         Returns:
             None
         """
-        self.data[url] = SavedEndpoint(data, self._get_expiration(headers))
+        self.data[url] = SavedEndpoint(
+            data,
+            self._get_expiration(headers),
+            self.encoding,
+            int(headers.get("x-pages", 1)),
+            headers.get("etag"),
+        )
 
     def _check_expiration(self, url: str, data: "SavedEndpoint") -> "SavedEndpoint":
         """Checks the expiration time for data for a url.
@@ -83,6 +111,195 @@ class Cache:
             data = self._check_expiration(url, data)
         return data.data if data else None
 
+    def peek(self, url: str) -> Optional[Any]:
+        """Returns the data stored for a url, even if it has expired.
+
+        Unlike `check`, expired data is neither removed nor treated as missing,
+        which makes this useful for comparing a fresh page against the last one.
+
+        Args:
+            url: url to look up
+
+        Returns:
+            value of the data, possibly None
+        """
+        data = self.data.get(url)
+        return data.data if data else None
+
+    def pages(self, url: str) -> int:
+        """Returns the number of pages ESI reported for a url.
+
+        Args:
+            url: url to look up
+
+        Returns:
+            value of the `X-Pages` header when the url was stored, or 1
+        """
+        data = self.data.get(url)
+        return data.pages if data else 1
+
+    def dump(self, path: str) -> int:
+        """Writes the unexpired entries of the cache to a snapshot file.
+
+        The file is written to a temporary path and then moved into place, so
+        a crash while dumping never leaves a truncated snapshot behind.
+        Entries that are already stored serialized are written as-is.
+
+        Args:
+            path: path of the snapshot file
+
+        Returns:
+            value of the number of entries written
+        """
+        now = time.time()
+        count = 0
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(self.SNAPSHOT_MAGIC)
+            for url, entry in list(self.data.items()):
+                if entry.expires_after < now:
+                    continue
+                self._write_snapshot_record(f, url, entry)
+                count += 1
+        os.replace(tmp_path, path)
+        return count
+
+    def _write_snapshot_record(
+        self, f: BinaryIO, url: str, entry: "SavedEndpoint"
+    ) -> None:
+        """Writes an entry to a snapshot file.
+
+        Args:
+            f: snapshot file
+            url: url for the request
+            entry: cached page
+
+        Returns:
+            None
+        """
+        encoding, payload = entry.serialized()
+        url_bytes = url.encode("utf-8")
+        etag_bytes = (entry.etag or "").encode("utf-8")
+        f.write(
+            self.SNAPSHOT_RECORD.pack(
+                entry.expires_in,
+                entry.expires_after,
+                entry.pages,
+                self.SNAPSHOT_ENCODINGS.index(encoding),
+                len(url_bytes),
+                len(etag_bytes),
+                len(payload),
+            )
+        )
+        f.write(url_bytes)
+        f.write(etag_bytes)
+        f.write(payload)
+
+    def add_entry(self, url: str, entry: "SavedEndpoint") -> None:
+        """Adds an existing entry to the cache, such as one from another cache.
+
+        The entry is converted to this cache's storage encoding if needed.
+
+        Args:
+            url: url for the request
+            entry: cached page
+
+        Returns:
+            None
+        """
+        if entry.encoding != self.encoding:
+            entry.reencode(self.encoding)
+        self.data[url] = entry
+
+    def load(self, path: str) -> int:
+        """Adds the entries from a snapshot file to the cache.
+
+        The file is streamed record by record; expired entries are skipped
+        without decoding their payload. Payloads already in this cache's
+        storage encoding are kept as bytes and not decoded at all.
+
+        Args:
+            path: path of the snapshot file
+
+        Returns:
+            value of the number of entries loaded
+        """
+        now = time.time()
+        count = 0
+        with open(path, "rb") as f:
+            if f.read(len(self.SNAPSHOT_MAGIC)) != self.SNAPSHOT_MAGIC:
+                raise ValueError(f"{path} is not a Preston cache snapshot")
+            while True:
+                record = self._read_snapshot_record(f)
+                if record is None:
+                    return count
+                url, entry = record
+                if entry.expires_after < now:
+                    continue
+                self.add_entry(url, entry)
+                count += 1
+
+    def _read_snapshot_record(self, f: BinaryIO) -> Optional[tuple]:
+        """Reads the next entry from a snapshot file.
+
+        Expired entries are returned with their payload left unread.
+
+        Args:
+            f: snapshot file, positioned at the start of a record
+
+        Returns:
+            tuple of url and `SavedEndpoint`, or None at the end of the file
+        """
+        header = f.read(self.SNAPSHOT_RECORD.size)
+        if not header:
+            return None
+        if len(header) < self.SNAPSHOT_RECORD.size:
+            raise ValueError("Truncated cache snapshot")
+        (
+            expires_in,
+            expires_after,
+            pages,
+            encoding,
+            url_length,
+            etag_length,
+            payload_length,
+        ) = self.SNAPSHOT_RECORD.unpack(header)
+        url = self._read_exact(f, url_length).decode("utf-8")
+        etag = self._read_exact(f, etag_length).decode("utf-8") or None
+        if expires_after < time.time():
+            end = f.tell() + payload_length
+            if f.seek(0, os.SEEK_END) < end:
+                raise ValueError("Truncated cache snapshot")
+            f.seek(end)
+            payload = b""
+        else:
+            payload = self._read_exact(f, payload_length)
+        entry = SavedEndpoint.from_serialized(
+            payload,
+            self.SNAPSHOT_ENCODINGS[encoding],
+            expires_in,
+            expires_after,
+            pages,
+            etag,
+        )
+        return url, entry
+
+    @staticmethod
+    def _read_exact(f: BinaryIO, length: int) -> bytes:
+        """Reads a field of a snapshot record.
+
+        Args:
+            f: snapshot file
+            length: length of the field
+
+        Returns:
+            bytes of the field
+        """
+        data = f.read(length)
+        if len(data) < length:
+            raise ValueError("Truncated cache snapshot")
+        return data
+
     def __len__(self) -> int:
         """Returns the number of items in the stored data.
 
@@ -98,20 +315,267 @@ class Cache:
         return len(self.data.keys())
 
 
+class SharedCache(Cache):
+    def __init__(self, directory: str, compact: bool = False, compress: bool = False):
+        """SharedCache class.
+
+        A cache that several processes can share through a directory. Each
+        page that's stored is also written to its own file there, in the
+        snapshot record format, and a page missing from memory is looked up
+        in the directory before it's treated as missing. This way a page that
+        one process fetched is not fetched again by the others.
+
+        Args:
+            directory: path of an existing directory to share pages through
+            compact: see `Cache`
+            compress: see `Cache`
+
+        Returns:
+            None
+        """
+        super().__init__(compact, compress)
+        self.directory = directory
+
+    def _entry_path(self, url: str) -> str:
+        """Returns the path of the file a url's page is shared through.
+
+        Args:
+            url: url for the request
+
+        Returns:
+            path in the shared directory
+        """
+        name = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, name)
+
+    def set(self, data: dict, headers: dict, url: str) -> None:
+        """Adds a response to the cache, and shares it with other processes.
+
+        The file is written to a temporary path and then moved into place, so
+        other processes never read a partly written page.
+
+        Args:
+            data: response from ESI
+            headers: headers from ESI
+            url: url for the request
+
+        Returns:
+            None
+        """
+        super().set(data, headers, url)
+        self._share(url, self.data[url])
+
+    def seed(self, cache: Cache) -> int:
+        """Shares the unexpired entries of another cache through the directory.
+
+        The entries are only written to the directory, not kept in memory;
+        processes read them from there when they need them.
+
+        Args:
+            cache: cache to share the entries of
+
+        Returns:
+            value of the number of entries shared
+        """
+        now = time.time()
+        count = 0
+        for url, entry in list(cache.data.items()):
+            if entry.expires_after < now:
+                continue
+            self._share(url, entry)
+            count += 1
+        return count
+
+    def _share(self, url: str, entry: "SavedEndpoint") -> None:
+        """Writes an entry to its file in the shared directory.
+
+        Args:
+            url: url for the request
+            entry: cached page
+
+        Returns:
+            None
+        """
+        path = self._entry_path(url)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(self.SNAPSHOT_MAGIC)
+            self._write_snapshot_record(f, url, entry)
+        os.replace(tmp_path, path)
+
+    def check(self, url: str) -> Optional[dict]:
+        """Check if data for a url has expired.
+
+        A page that isn't in memory is looked up in the shared directory.
+
+        Args:
+            url: url to check expiration on
+
+        Returns:
+            value of the data, possibly None
+        """
+        if url not in self.data:
+            self._load_shared(url)
+        return super().check(url)
+
+    def _load_shared(self, url: str) -> None:
+        """Adds a url's page from the shared directory to memory.
+
+        Nothing is added if the page isn't there or has expired.
+
+        Args:
+            url: url for the request
+
+        Returns:
+            None
+        """
+        try:
+            with open(self._entry_path(url), "rb") as f:
+                if f.read(len(self.SNAPSHOT_MAGIC)) != self.SNAPSHOT_MAGIC:
+                    return
+                record = self._read_snapshot_record(f)
+        except FileNotFoundError:
+            return
+        if record is None:
+            return
+        shared_url, entry = record
+        if shared_url == url and entry.expires_after >= time.time():
+            self.add_entry(url, entry)
+
+
 class SavedEndpoint:
-    def __init__(self, data: dict, expires_in: float) -> None:
+    ENCODING_JSON = "json"
+    ENCODING_ZLIB = "zlib"
+
+    __slots__ = (
+        "payload",
+        "encoding",
+        "expires_in",
+        "expires_after",
+        "pages",
+        "etag",
+    )
+
+    def __init__(
+        self,
+        data: Any,
+        expires_in: float,
+        encoding: Optional[str] = None,
+        pages: int = 1,
+        etag: Optional[str] = None,
+    ) -> None:
         """SavedEndpoint class.
 
         A wrapper around a page from ESI that also includes the expiration time
         in seconds and the time after which the wrapped data expires.
 
+        If an encoding is given, the page is stored serialized and only decoded
+        when the `data` property is read.
+
         Args:
             data: page data from ESI
             expires_in: number of seconds from now that the data expires
+            encoding: None, `ENCODING_JSON`, or `ENCODING_ZLIB`
+            pages: total number of pages for the request, from `X-Pages`
+            etag: value of the `ETag` header, if any
 
         Returns:
             None
         """
-        self.data = data
+        self.encoding = encoding
+        self.payload = self._encode(data, encoding)
         self.expires_in = expires_in
         self.expires_after = time.time() + expires_in
+        self.pages = pages
+        self.etag = etag
+
+    def _encode(self, data: Any, encoding: Optional[str]) -> Any:
+        """Serializes page data for storage.
+
+        Args:
+            data: page data from ESI
+            encoding: None, `ENCODING_JSON`, or `ENCODING_ZLIB`
+
+        Returns:
+            the data itself if encoding is None, otherwise bytes
+        """
+        if encoding is None:
+            return data
+        payload = json.dumps(data, separators=(",", ":")).encode("utf-8")
+        if encoding == self.ENCODING_ZLIB:
+            payload = zlib.compress(payload)
+        return payload
+
+    def serialized(self) -> tuple[str, bytes]:
+        """Returns the page as bytes, for writing to disk.
+
+        Args:
+            None
+
+        Returns:
+            tuple of the bytes' encoding and the bytes
+        """
+        if self.encoding is None:
+            return self.ENCODING_JSON, self._encode(self.payload, self.ENCODING_JSON)
+        return self.encoding, self.payload
+
+    @classmethod
+    def from_serialized(
+        cls,
+        payload: bytes,
+        encoding: str,
+        expires_in: float,
+        expires_after: float,
+        pages: int = 1,
+        etag: Optional[str] = None,
+    ) -> "SavedEndpoint":
+        """Creates an entry from a page that's already serialized.
+
+        Args:
+            payload: page as bytes, or the page data itself if encoding is None
+            encoding: None, `ENCODING_JSON`, or `ENCODING_ZLIB`
+            expires_in: number of seconds the data was valid for when fetched
+            expires_after: time after which the data expires
+            pages: total number of pages for the request, from `X-Pages`
+            etag: value of the `ETag` header, if any
+
+        Returns:
+            new SavedEndpoint
+        """
+        entry = cls.__new__(cls)
+        entry.payload = payload
+        entry.encoding = encoding
+        entry.expires_in = expires_in
+        entry.expires_after = expires_after
+        entry.pages = pages
+        entry.etag = etag
+        return entry
+
+    def reencode(self, encoding: Optional[str]) -> None:
+        """Changes how the page is stored.
+
+        Args:
+            encoding: None, `ENCODING_JSON`, or `ENCODING_ZLIB`
+
+        Returns:
+            None
+        """
+        self.payload = self._encode(self.data, encoding)
+        self.encoding = encoding
+
+    @property
+    def data(self) -> Any:
+        """Returns the wrapped page, decoding it if it's stored serialized.
+
+        Args:
+            None
+
+        Returns:
+            page data from ESI
+        """
+        if self.encoding is None:
+            return self.payload
+        payload = self.payload
+        if self.encoding == self.ENCODING_ZLIB:
+            payload = zlib.decompress(payload)
+        return json.loads(payload)
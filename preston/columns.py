@@ -0,0 +1,106 @@
+from array import array
+from typing import Any, Iterable, Optional
+
+# (type, format) from the spec -> `array` typecode
+TYPECODES = {
+    ("integer", "int32"): "i",
+    ("integer", "int64"): "q",
+    ("integer", None): "q",
+    ("number", "float"): "f",
+    ("number", "double"): "d",
+    ("number", None): "d",
+    ("boolean", None): "b",
+}
+
+
+def column_typecodes(schema: dict) -> dict:
+    """Determines the column types for a list response from its schema.
+
+    Args:
+        schema: response schema from the spec; expected to be an array of objects
+
+    Returns:
+        dict of field names to `array` typecodes, or None for fields that
+        can't be stored in a typed buffer (strings, objects, ...)
+    """
+    properties = schema.get("items", {}).get("properties", {})
+    return {
+        field: TYPECODES.get((sub.get("type"), sub.get("format")))
+        for field, sub in properties.items()
+    }
+
+
+def to_columns(
+    pages: Iterable[list[dict]],
+    typecodes: dict,
+    use_numpy: Optional[bool] = None,
+) -> dict:
+    """Decodes pages of homogeneous records into one column per field.
+
+    Numeric and boolean fields are accumulated into `array` buffers, one page
+    at a time. A column that turns out to hold missing values, or values out
+    of its typecode's range, falls back to a plain list. If numpy is
+    available (and not disabled), typed columns are returned as numpy arrays
+    sharing the buffers' memory, and the rest as object arrays.
+
+    Args:
+        pages: iterable of pages, each a list of dicts
+        typecodes: dict of field names to typecodes, see `column_typecodes`
+        use_numpy: whether to return numpy arrays; defaults to True if numpy
+                   is installed
+
+    Returns:
+        dict of field names to columns
+    """
+    numpy = _import_numpy() if use_numpy is not False else None
+    if use_numpy and numpy is None:
+        raise ImportError("numpy is required for use_numpy=True")
+    columns = {field: array(code) if code else [] for field, code in typecodes.items()}
+    for page in pages:
+        for field, column in columns.items():
+            values = [record.get(field) for record in page]
+            if isinstance(column, array):
+                start = len(column)
+                try:
+                    column.extend(values)
+                    continue
+                except (TypeError, OverflowError):
+                    del column[start:]
+                    column = columns[field] = column.tolist()
+            column.extend(values)
+    if numpy is not None:
+        return {field: _to_numpy(numpy, column) for field, column in columns.items()}
+    return columns
+
+
+def _import_numpy() -> Any:
+    """Imports numpy, if it's installed.
+
+    numpy is slow to import, so it's only loaded when columns are built.
+
+    Args:
+        None
+
+    Returns:
+        the numpy module, or None
+    """
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def _to_numpy(numpy: Any, column: Any) -> Any:
+    """Converts a column to a numpy array.
+
+    Args:
+        numpy: the numpy module
+        column: `array` buffer or list
+
+    Returns:
+        numpy array
+    """
+    if isinstance(column, array):
+        return numpy.frombuffer(column, dtype=column.typecode)
+    return numpy.array(column, dtype=object)
@@ -0,0 +1,312 @@
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+import zlib
+from contextlib import contextmanager
+from typing import Any, Hashable, Iterable, Iterator, Optional
+
+from .cache import SavedEndpoint, SharedCache
+from .preston import Preston
+from .validation import ParameterError
+
+
+class CrawlError:
+    """CrawlError class.
+
+    Stands in for the result of a crawl job that failed.
+
+    Args:
+        op_id: operation id of the job
+        params: parameters of the job
+        message: description of the error
+    """
+
+    def __init__(self, op_id: str, params: dict, message: str) -> None:
+        self.op_id = op_id
+        self.params = params
+        self.message = message
+
+    def __repr__(self) -> str:
+        return f"CrawlError({self.op_id!r}, {self.params!r}, {self.message!r})"
+
+
+class SharedErrorBudget:
+    """SharedErrorBudget class.
+
+    Tracks ESI's error limit in shared memory, so that every process of a
+    crawl backs off together when the limit runs low. Used in place of a
+    `RequestScheduler` in the crawl's worker processes.
+
+    Args:
+        remain: shared `Value` holding the number of errors left
+        reset_at: shared `Value` holding the time the error window resets
+        floor: number of errors to keep in reserve; requests wait for the
+               window to reset when fewer than this are left
+    """
+
+    def __init__(self, remain: Any, reset_at: Any, floor: int = 20) -> None:
+        self.remain = remain
+        self.reset_at = reset_at
+        self.floor = floor
+
+    @contextmanager
+    def slot(
+        self, route: str, priority: int = 0, owner: Hashable = None
+    ) -> Iterator[None]:
+        """Waits until the error budget allows sending a request.
+
+        Args:
+            route: operation id or path of the request (unused)
+            priority: priority class of the request (unused)
+            owner: key of the request's owner (unused)
+
+        Returns:
+            context manager
+        """
+        while True:
+            with self.remain.get_lock():
+                wait = self.reset_at.value - time.time()
+                if self.remain.value >= self.floor or wait <= 0:
+                    break
+            time.sleep(wait)
+        yield
+
+    def update_error_limit(self, headers: Any) -> None:
+        """Records ESI's error limit state from a response's headers.
+
+        Args:
+            headers: headers from ESI
+
+        Returns:
+            None
+        """
+        remain = headers.get("X-Esi-Error-Limit-Remain")
+        if remain is None:
+            return
+        reset = headers.get("X-Esi-Error-Limit-Reset", 0)
+        with self.remain.get_lock():
+            self.remain.value = int(remain)
+            self.reset_at.value = time.time() + int(reset)
+
+
+# per-process client, set up by `_init_worker`
+_worker_preston: Optional[Preston] = None
+
+
+def _init_worker(
+    kwargs: dict,
+    spec: dict,
+    directory: str,
+    remain: Any,
+    reset_at: Any,
+    error_floor: int,
+) -> None:
+    """Creates the derived client for a crawl worker process.
+
+    Args:
+        kwargs: configuration options of the parent's client
+        spec: OpenAPI spec data, so workers don't fetch it again
+        directory: path of the directory the workers share pages through,
+                   seeded with the parent's cache, see `SharedCache`
+        remain: shared `Value` of errors left, see `SharedErrorBudget`
+        reset_at: shared `Value` of the error window reset time
+        error_floor: see `SharedErrorBudget`
+
+    Returns:
+        None
+    """
+    global _worker_preston
+    _worker_preston = Preston(
+        **kwargs, scheduler=SharedErrorBudget(remain, reset_at, error_floor)
+    )
+    _worker_preston.spec = spec
+    _worker_preston.cache = SharedCache(
+        directory,
+        compact=kwargs.get("compact_cache", False),
+        compress=kwargs.get("compress_cache", False),
+    )
+
+
+def _run_job(job: tuple[int, tuple[str, dict]]) -> tuple:
+    """Runs one crawl job in a worker process.
+
+    The result is sent back as JSON bytes, together with its cache metadata,
+    so the parent can write it out or cache it without decoding it. Any error
+    is reported as a `CrawlError`, so one bad job can't abort the sweep.
+
+    Args:
+        job: tuple of the job's index, and its operation id and parameters
+
+    Returns:
+        tuple of the index, and either the cache entry fields or a `CrawlError`
+    """
+    index, (op_id, params) = job
+    try:
+        return index, _fetch_job(op_id, params)
+    except Exception as exc:
+        return index, CrawlError(op_id, params, repr(exc))
+
+
+def _fetch_job(op_id: str, params: dict) -> tuple | CrawlError:
+    """Queries the ESI for one crawl job.
+
+    With `validate_params`, the parameters are checked and normalized first,
+    and a `ParameterError` is reported as a `CrawlError`.
+
+    Args:
+        op_id: operation id of the job
+        params: parameters of the job
+
+    Returns:
+        tuple of the cache entry fields, or a `CrawlError`
+    """
+    preston = _worker_preston
+    path = preston._get_path_for_op_id(op_id)
+    if path is None:
+        return CrawlError(op_id, params, f"Unknown operation id {op_id!r}")
+    # reject bad parameters before anything is sent to ESI
+    try:
+        params = preston._validate_params(op_id, params)
+    except ParameterError as exc:
+        return CrawlError(op_id, params, str(exc))
+    data = preston.get_path(path, params, op_id)
+    url = preston._build_url(path, params)
+    entry = preston.cache.data.get(url)
+    if entry is None:
+        payload = json.dumps(data, separators=(",", ":")).encode("utf-8")
+        return url, payload, 0, 0.0, 1, None
+    encoding, payload = entry.serialized()
+    if encoding == SavedEndpoint.ENCODING_ZLIB:
+        payload = zlib.decompress(payload)
+    return (
+        url,
+        payload,
+        entry.expires_in,
+        entry.expires_after,
+        entry.pages,
+        entry.etag,
+    )
+
+
+def crawl(
+    preston: Preston,
+    jobs: Iterable[tuple[str, dict]],
+    processes: Optional[int] = None,
+    sink: Optional[str] = None,
+    update_cache: bool = True,
+    error_floor: int = 20,
+    chunksize: int = 16,
+) -> list | int:
+    """Runs a large sweep of ESI queries across a pool of processes.
+
+    Each process holds its own client derived from `preston`'s configuration,
+    starting from the already loaded spec. All the processes share one error
+    limit budget through shared memory, and back off together when it runs
+    low. They also share pages through a temporary directory (see
+    `SharedCache`), seeded once with `preston`'s cache: each process only
+    reads the pages it needs from there, and once one process has cached a
+    page, the others don't fetch it again.
+
+    Results are streamed back as raw JSON bytes. With `sink`, each is written
+    to that file as a JSON line of `{"op_id", "params", "data"}` (or `"error"`
+    for failed jobs) without being decoded in this process, which is the way
+    to scale a sweep across every core. Without it, the results are decoded
+    and returned in job order, with a `CrawlError` in place of failed jobs.
+
+    Callables in the configuration, like `refresh_token_callback`, are not
+    passed to the workers; the access token is refreshed once up front and
+    shared instead.
+
+    Args:
+        preston: client to derive the workers' clients from
+        jobs: iterable of (operation id, parameters) tuples
+        processes: number of worker processes, defaults to the number of CPUs
+        sink: path of a file to write results to, as JSON lines
+        update_cache: if True, results are also added to `preston`'s cache;
+                      for a cache that isn't compact, this decodes every
+                      result in this process (once, even without a sink)
+        error_floor: see `SharedErrorBudget`
+        chunksize: number of jobs sent to a worker at once
+
+    Returns:
+        list of results if there's no sink, otherwise the number of results
+        written
+    """
+    jobs = list(jobs)
+    preston._try_refresh_access_token()
+    kwargs = {
+        key: value
+        for key, value in preston._kwargs.items()
+        if key not in ("scheduler", "tracer", "refresh_token_callback")
+    }
+    kwargs.update(
+        access_token=preston.access_token,
+        access_expiration=preston.access_expiration,
+        refresh_token=preston.refresh_token,
+    )
+    spec = preston._get_spec()
+
+    context = multiprocessing.get_context()
+    remain = context.Value("i", 100)
+    reset_at = context.Value("d", 0.0)
+    directory = tempfile.mkdtemp(prefix="preston-crawl-")
+    results: list = [None] * len(jobs)
+    written = 0
+    try:
+        SharedCache(directory).seed(preston.cache)
+        initargs = (
+            kwargs,
+            spec,
+            directory,
+            remain,
+            reset_at,
+            error_floor,
+        )
+        with (
+            context.Pool(processes, _init_worker, initargs) as pool,
+            open(sink or os.devnull, "wb") as out,
+        ):
+            for index, result in pool.imap_unordered(
+                _run_job, enumerate(jobs), chunksize
+            ):
+                op_id, params = jobs[index]
+                if isinstance(result, CrawlError):
+                    results[index] = result
+                    if sink:
+                        line = {"op_id": op_id, "params": params}
+                        line["error"] = result.message
+                        out.write(json.dumps(line).encode("utf-8") + b"\n")
+                        written += 1
+                    continue
+                url, payload, expires_in, expires_after, pages, etag = result
+                data = None
+                if update_cache and expires_after > time.time():
+                    if preston.cache.encoding is None:
+                        # decoded once, for both the cache and the results
+                        data = json.loads(payload)
+                        entry = SavedEndpoint.from_serialized(
+                            data, None, expires_in, expires_after, pages, etag
+                        )
+                    else:
+                        entry = SavedEndpoint.from_serialized(
+                            payload,
+                            SavedEndpoint.ENCODING_JSON,
+                            expires_in,
+                            expires_after,
+                            pages,
+                            etag,
+                        )
+                    preston.cache.add_entry(url, entry)
+                if sink:
+                    prefix = json.dumps({"op_id": op_id, "params": params})[:-1]
+                    out.write(prefix.encode("utf-8") + b', "data": ')
+                    out.write(payload + b"}\n")
+                    written += 1
+                else:
+                    results[index] = json.loads(payload) if data is None else data
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return written if sink else results
@@ -1,14 +1,21 @@
 import base64
+import hashlib
+import json
 import re
 import time
 from http import HTTPStatus
 from json import JSONDecodeError
-from typing import Optional, Any, Union
+from typing import Optional, Any, Iterator, Union
 
-import jwt
 import requests
+from requests.adapters import HTTPAdapter
 
 from .cache import Cache
+from .columns import column_typecodes, to_columns
+from .scheduler import RequestScheduler
+from .schema import build_decoders
+from .tracing import Tracer
+from .validation import build_validators
 
 
 class Preston:
@@ -40,6 +47,54 @@ class Preston:
                                 access tokens; can be supplied with or without
                                 access_token and access_expiration
 
+        cache_post              if True, `post_op` caches the responses of
+                                read-only POST operations (see `post_op`)
+
+        tracer                  `Tracer` that records the stages of each request,
+                                like `SpanTracer`; tracing is off by default
+
+        scheduler               `RequestScheduler` to queue requests through;
+                                share one between instances to have them
+                                scheduled together
+
+        priority                priority class of this instance's requests in
+                                the scheduler (default `RequestScheduler.NORMAL`)
+
+        scheduler_key           key this instance's requests are fairly queued
+                                under in the scheduler (defaults to the instance)
+
+        eager_token_refresh     if True, refresh the access token in __init__
+                                instead of on the first authenticated request
+
+        pool_connections        number of per-host connection pools to keep
+                                in the shared session (default 10)
+
+        pool_maxsize            max number of connections kept open per host
+                                (default 10)
+
+        pool_block              if True, block when all connections to a host
+                                are in use instead of opening throwaway ones
+
+        keep_alive              if False, ask servers to close the connection
+                                after each request (default True)
+
+        compression             if False, don't request gzip/deflate encoded
+                                responses (default True)
+
+        compact_cache           if True, cached pages are stored as JSON bytes
+                                and decoded on each cache hit
+
+        compress_cache          like compact_cache, but the bytes are also
+                                zlib-compressed
+
+        typed_responses         if True, `get_op` decodes responses into
+                                slotted record types generated from the spec's
+                                response schemas
+
+        validate_params         if True, the `*_op` methods check parameters
+                                against the spec before sending anything, and
+                                normalize them (see `_validate_params`)
+
     Args:
         kwargs: various configuration options
     """
@@ -53,18 +108,42 @@ class Preston:
     AUTHORIZE_URL = OAUTH_URL + "/authorize"
     METHODS = ["get", "post", "put", "delete"]
     OPERATION_ID_KEY = "operationId"
+    POST_ITEM_KEYS = ["id", "character_id", "item_id"]
+    DELTA_ID_KEYS = [
+        "order_id",
+        "contract_id",
+        "item_id",
+        "transaction_id",
+        "journal_id",
+        "killmail_id",
+        "job_id",
+        "event_id",
+        "notification_id",
+        "mail_id",
+    ]
     VAR_REPLACE_REGEX = r"{(\w+)}"
+    DEFAULT_POOL_CONNECTIONS = 10
+    DEFAULT_POOL_MAXSIZE = 10
 
     def __init__(self, **kwargs: Any) -> None:
-        self.cache = Cache()
+        self.cache = Cache(
+            compact=kwargs.get("compact_cache", False),
+            compress=kwargs.get("compress_cache", False),
+        )
         self.spec = None
+        self.typed_responses = kwargs.get("typed_responses", False)
+        self._response_decoders = None
+        self.validate_params = kwargs.get("validate_params", False)
+        self._validators = None
         self.version = kwargs.get("version", "latest")
-        self.session = requests.Session()
-        self.session.headers.update(
-            {"User-Agent": kwargs.get("user_agent", ""), "Accept": "application/json"}
-        )
+        self.session = self._build_session(kwargs)
         self.timeout = kwargs.get("timeout", 6)
         self.retries = kwargs.get("retries", 4)
+        self.cache_post = kwargs.get("cache_post", False)
+        self.tracer = kwargs.get("tracer") or Tracer()
+        self.scheduler = kwargs.get("scheduler")
+        self.priority = kwargs.get("priority", RequestScheduler.NORMAL)
+        self.scheduler_key = kwargs.get("scheduler_key", id(self))
         self.client_id = kwargs.get("client_id")
         self.client_secret = kwargs.get("client_secret")
         self.callback_url = kwargs.get("callback_url")
@@ -84,14 +163,95 @@ class Preston:
         self.refresh_token_callback = kwargs.get("refresh_token_callback")
         self.stored_headers = []
         self._kwargs = kwargs
-        if not kwargs.get("no_update_token", False):
+        if kwargs.get("eager_token_refresh", False) and not kwargs.get(
+            "no_update_token", False
+        ):
             self._try_refresh_access_token()
+        elif self.access_token:
+            self.session.headers.update(
+                {"Authorization": f"Bearer {self.access_token}"}
+            )
+
+    def _build_session(self, kwargs: dict) -> requests.Session:
+        """Creates the shared `requests` session used for every outgoing call.
+
+        The session's adapters are sized from the pool kwargs so that concurrent
+        calls against one instance reuse connections instead of opening new ones.
+
+        Args:
+            kwargs: configuration options passed to __init__
+
+        Returns:
+            configured session
+        """
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=kwargs.get(
+                "pool_connections", self.DEFAULT_POOL_CONNECTIONS
+            ),
+            pool_maxsize=kwargs.get("pool_maxsize", self.DEFAULT_POOL_MAXSIZE),
+            pool_block=kwargs.get("pool_block", False),
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update(
+            {
+                "User-Agent": kwargs.get("user_agent", ""),
+                "Accept": "application/json",
+                "Accept-Encoding": (
+                    "gzip, deflate" if kwargs.get("compression", True) else "identity"
+                ),
+                "Connection": (
+                    "keep-alive" if kwargs.get("keep_alive", True) else "close"
+                ),
+            }
+        )
+        return session
+
+    def get_pool_stats(self) -> list[dict]:
+        """Returns usage information for each host's connection pool.
+
+        `in_use` is the number of connections currently checked out of the pool;
+        a `saturation` of 1.0 means every pooled connection to that host is busy
+        and further concurrent requests either block or open throwaway connections.
+
+        Args:
+            None
+
+        Returns:
+            list of dicts, one per host pool
+        """
+        stats = []
+        seen = set()
+        for adapter in self.session.adapters.values():
+            if id(adapter) in seen:
+                continue
+            seen.add(id(adapter))
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is None or pool.pool is None:
+                    continue
+                maxsize = pool.pool.maxsize
+                in_use = maxsize - pool.pool.qsize()
+                stats.append(
+                    {
+                        "host": f"{pool.scheme}://{pool.host}:{pool.port}",
+                        "maxsize": maxsize,
+                        "in_use": in_use,
+                        "saturation": in_use / maxsize if maxsize else 0.0,
+                        "connections_opened": pool.num_connections,
+                        "requests": pool.num_requests,
+                    }
+                )
+        return stats
 
     def _retry_request(
         self,
         requests_function: callable,
         target_url: str,
         return_metadata=False,
+        route: Optional[str] = None,
         **kwargs,
     ) -> dict | tuple[dict, dict, str] | Any:
         """
@@ -104,6 +264,7 @@ class Preston:
             requests_function: Function to call to make the request
             target_url:        Target URL for request
             return_metadata:   Whether to return raw response or json. In this case no retries on JSONDecodeError
+            route:             Operation id or path the scheduler applies route limits to; defaults to the URL
             **kwargs:          Additional keyword arguments for function
         Returns:
             new response
@@ -114,12 +275,17 @@ class Preston:
 
         for x in range(self.retries):
             try:
-                resp = requests_function(target_url, **kwargs, timeout=self.timeout)
+                resp = self._send(
+                    requests_function, target_url, route or target_url, **kwargs
+                )
                 resp.raise_for_status()
                 if return_metadata:
-                    return resp.json(), resp.headers, resp.url
+                    with self.tracer.span("preston.json_decode"):
+                        data = resp.json()
+                    return data, resp.headers, resp.url
                 if resp.text:
-                    return resp.json()
+                    with self.tracer.span("preston.json_decode"):
+                        return resp.json()
                 return None
 
             except TimeoutError:
@@ -155,6 +321,29 @@ class Preston:
 
         raise requests.exceptions.ConnectionError("ESI could not complete the request.")
 
+    def _send(
+        self, requests_function: callable, target_url: str, route: str, **kwargs
+    ) -> requests.Response:
+        """Sends a single request, through the scheduler if there is one.
+
+        Args:
+            requests_function: Function to call to make the request
+            target_url:        Target URL for request
+            route:             Operation id or path for the scheduler's route limits
+            **kwargs:          Additional keyword arguments for function
+
+        Returns:
+            response
+        """
+        if self.scheduler is None:
+            with self.tracer.span("preston.network", url=target_url):
+                return requests_function(target_url, **kwargs, timeout=self.timeout)
+        with self.scheduler.slot(route, self.priority, self.scheduler_key):
+            with self.tracer.span("preston.network", url=target_url):
+                resp = requests_function(target_url, **kwargs, timeout=self.timeout)
+        self.scheduler.update_error_limit(resp.headers)
+        return resp
+
     def copy(self) -> "Preston":
         """Creates a copy of this Preston object.
 
@@ -345,10 +534,58 @@ class Preston:
         if self.spec:
             return self.spec
         self.spec = self._retry_request(
-            requests.get, self.SPEC_URL.format(self.version)
+            self.session.get, self.SPEC_URL.format(self.version)
         )
+        if self.typed_responses:
+            self._response_decoders = build_decoders(self.spec, self.METHODS)
+        if self.validate_params:
+            self._validators = build_validators(self.spec, self.METHODS)
         return self.spec
 
+    def _validate_params(self, op_id: str, data: Optional[dict]) -> Optional[dict]:
+        """Checks and normalizes the parameters for an operation.
+
+        The validators are built once, when the spec is loaded. Unknown or
+        missing required parameters, values of the wrong type, and values not
+        in the parameter's enum raise a `ParameterError` instead of sending a
+        malformed request to ESI. Booleans are canonicalized and arrays are
+        deduplicated and sorted, so equivalent calls share a cache entry.
+
+        Args:
+            op_id: operation id
+            data: parameters for the operation
+
+        Returns:
+            normalized parameters
+        """
+        if not self.validate_params or data is None:
+            return data
+        if self._validators is None:
+            self._validators = build_validators(self._get_spec(), self.METHODS)
+        validator = self._validators.get(op_id)
+        if validator is None:
+            return data
+        return validator(data)
+
+    def _decode_response(self, op_id: str, data: Any) -> Any:
+        """Decodes response data into the record types generated from the spec.
+
+        The decoders are built once, when the spec is loaded.
+
+        Args:
+            op_id: operation id
+            data: response data from ESI
+
+        Returns:
+            decoded data, or the data unchanged if the operation has no schema
+        """
+        if self._response_decoders is None:
+            self._response_decoders = build_decoders(self._get_spec(), self.METHODS)
+        decoder = self._response_decoders.get(op_id)
+        if decoder is None or data is None:
+            return data
+        return decoder(data)
+
     def _get_path_for_op_id(self, op_id: str) -> Optional[str]:
         """Searches the spec for a path matching the operation id.
 
@@ -366,6 +603,24 @@ class Preston:
                             return path_key
         return None
 
+    def _get_operation_for_op_id(self, op_id: str) -> Optional[dict]:
+        """Searches the spec for the operation matching the operation id.
+
+        Args:
+            op_id: operation id
+
+        Returns:
+            operation definition from the spec, or `None` if not found
+        """
+        path = self._get_path_for_op_id(op_id)
+        if path is None:
+            return None
+        path_value = self._get_spec()["paths"][path]
+        for method in self.METHODS:
+            if path_value.get(method, {}).get(self.OPERATION_ID_KEY) == op_id:
+                return path_value[method]
+        return None
+
     def _insert_vars(self, path: str, data: dict) -> tuple[str, dict]:
         """Inserts variables into the ESI URL path.
 
@@ -418,18 +673,23 @@ class Preston:
             character info if authenticated, otherwise an empty dict
         """
 
-        if not self.access_token:
+        if not self.access_token and not self.refresh_token:
             return {}
 
         self._try_refresh_access_token()
+        if not self.access_token:
+            return {}
+
+        # jwt pulls in cryptography, which is slow to import, so it's only
+        # loaded when it's actually needed
+        import jwt
 
         try:
             # Get the JWT header to determine the key ID (kid)
             unverified_header = jwt.get_unverified_header(self.access_token)
 
             # Fetch the public keys (JWKS)
-            jwks_response = requests.get(self.JWKS_URL)
-            jwks = jwks_response.json()
+            jwks = self._retry_request(self.session.get, self.JWKS_URL)
 
             # Find the public key with matching kid
             key = next(
@@ -463,7 +723,7 @@ class Preston:
             print(f"[whoami] Failed to decode/verify JWT: {e}")
             return {}
 
-    def get_path(self, path: str, data: dict) -> dict:
+    def get_path(self, path: str, data: dict, route: Optional[str] = None) -> dict:
         """Queries the ESI by an endpoint URL.
 
         This method is not marked "private" as it _can_ be used
@@ -473,23 +733,29 @@ class Preston:
         Args:
             path: raw ESI URL path
             data: data to insert into the URL
+            route: operation id for the scheduler, defaults to the path
 
         Returns:
             ESI data
         """
-        target_url = self._build_url(path, data)
-
-        cached_data = self.cache.check(target_url)
-        if cached_data:
-            return cached_data
-        self._try_refresh_access_token()
-
-        data, headers, url = self._retry_request(
-            self.session.get, target_url, return_metadata=True
-        )
-        self.cache.set(data, headers, url)
-        self.stored_headers.insert(0, headers)
-        return data
+        with self.tracer.span("preston.get_path", path=path):
+            with self.tracer.span("preston.build_url"):
+                target_url = self._build_url(path, data)
+
+            with self.tracer.span("preston.cache_check"):
+                cached_data = self.cache.check(target_url)
+            if cached_data:
+                return cached_data
+            with self.tracer.span("preston.token_refresh"):
+                self._try_refresh_access_token()
+
+            data, headers, url = self._retry_request(
+                self.session.get, target_url, return_metadata=True, route=route or path
+            )
+            with self.tracer.span("preston.cache_write"):
+                self.cache.set(data, headers, url)
+            self.stored_headers.insert(0, headers)
+            return data
 
     def get_op(self, op_id: str, **kwargs: str) -> dict:
         """Queries the ESI by looking up an operation id.
@@ -501,6 +767,9 @@ class Preston:
         Passed kwargs will first supply parameters in the URL,
         and then unused items will be used as query params.
 
+        If this instance was created with `typed_responses`, objects in the
+        response are returned as record types generated from the spec.
+
         Args:
             op_id: operation id
             kwargs: data to populate the endpoint's URL variables
@@ -508,11 +777,224 @@ class Preston:
         Returns:
             ESI data
         """
+        with self.tracer.span("preston.get_op", op_id=op_id):
+            with self.tracer.span("preston.operation_lookup"):
+                path = self._get_path_for_op_id(op_id)
+            with self.tracer.span("preston.validate_params"):
+                kwargs = self._validate_params(op_id, kwargs)
+            data = self.get_path(path, kwargs, op_id)
+            if self.typed_responses:
+                with self.tracer.span("preston.typed_decode"):
+                    return self._decode_response(op_id, data)
+            return data
+
+    def _iter_pages(
+        self,
+        path: str,
+        data: dict,
+        route: Optional[str] = None,
+        cache: bool = True,
+        paginated: bool = True,
+    ) -> Iterator[Any]:
+        """Queries every page of a paginated ESI endpoint.
+
+        Pages are fetched one at a time. With `cache`, they go through
+        `get_path`, so each is cached individually. Without it, pages already
+        in the cache are still used, but fetched pages aren't stored, so they
+        can be freed as soon as the caller is done with them. The number of
+        pages is taken from the `X-Pages` header of the first page.
+
+        Args:
+            path: raw ESI URL path
+            data: data to insert into the URL
+            route: operation id for the scheduler, defaults to the path
+            cache: whether to store fetched pages in the cache
+            paginated: whether the endpoint takes a `page` parameter; if not,
+                       it's queried once, without one
+
+        Yields:
+            ESI data of each page
+        """
+        page, pages = 1, 1
+        while page <= pages:
+            page_data = dict(data, page=page) if paginated else data
+            url = self._build_url(path, page_data)
+            if cache:
+                yield self.get_path(path, page_data, route)
+                pages = self.cache.pages(url)
+            else:
+                cached_data = self.cache.check(url)
+                if cached_data:
+                    pages = self.cache.pages(url)
+                    yield cached_data
+                else:
+                    self._try_refresh_access_token()
+                    page_result, headers, _ = self._retry_request(
+                        self.session.get,
+                        url,
+                        return_metadata=True,
+                        route=route or path,
+                    )
+                    pages = int(headers.get("x-pages", 1))
+                    yield page_result
+            if not paginated:
+                return
+            page += 1
+
+    def get_op_columns(
+        self,
+        op_id: str,
+        use_numpy: Optional[bool] = None,
+        cache: bool = False,
+        **kwargs: str,
+    ) -> dict:
+        """Queries a list endpoint and returns the records as columns.
+
+        All pages are fetched and decoded straight into one column per field
+        of the response schema. Numeric fields become typed buffers: numpy
+        arrays if numpy is installed, `array.array` otherwise. Other fields
+        are returned as lists (or numpy object arrays).
+
+        By default, fetched pages are not stored in the cache, so only one
+        page of records is held in memory next to the columns at a time.
+        Pages that are already cached are still used.
+
+        Args:
+            op_id: operation id
+            use_numpy: whether to return numpy arrays; defaults to True if
+                       numpy is installed
+            cache: if True, fetched pages are also stored in the cache, which
+                   keeps every page's records in memory alongside the columns
+            kwargs: data to populate the endpoint's URL variables
+
+        Returns:
+            dict of field names to columns
+        """
+        operation = self._get_operation_for_op_id(op_id) or {}
+        schema = operation.get("responses", {}).get("200", {}).get("schema", {})
+        if schema.get("type") != "array":
+            raise ValueError(f"{op_id} does not return a list")
         path = self._get_path_for_op_id(op_id)
-        return self.get_path(path, kwargs)
+        kwargs = self._validate_params(op_id, kwargs)
+        return to_columns(
+            self._iter_pages(path, kwargs, op_id, cache, self._is_paginated(op_id)),
+            column_typecodes(schema),
+            use_numpy,
+        )
+
+    def get_op_delta(
+        self, op_id: str, id_key: Optional[str] = None, **kwargs: str
+    ) -> dict:
+        """Queries the ESI by an operation id and returns what changed.
+
+        The response is compared against the payload previously stored in the
+        cache for the same URL, and records are matched on their natural ID. If
+        there is no previous payload, every record is reported as added.
+
+        For paginated operations, every page is fetched and the records of all
+        pages are compared at once, so records that moved to another page
+        aren't reported as changes.
+
+        Args:
+            op_id: operation id
+            id_key: name of the ID field of each record; when not supplied, the
+                    first field from `DELTA_ID_KEYS` present in the data is used
+            kwargs: data to populate the endpoint's URL variables
+
+        Returns:
+            dict with `added`, `removed`, and `changed` lists of records; the
+            `changed` list contains the new versions of the records
+        """
+        path = self._get_path_for_op_id(op_id)
+        kwargs = self._validate_params(op_id, kwargs)
+        if not self._is_paginated(op_id):
+            previous = self.cache.peek(self._build_url(path, kwargs)) or []
+            current = self.get_path(path, kwargs, op_id) or []
+            return self._diff_collections(previous, current, id_key)
+
+        previous = []
+        first_url = self._build_url(path, dict(kwargs, page=1))
+        for page in range(1, self.cache.pages(first_url) + 1):
+            page_data = self.cache.peek(self._build_url(path, dict(kwargs, page=page)))
+            previous.extend(page_data or [])
+        current = []
+        for page_data in self._iter_pages(path, kwargs, op_id):
+            current.extend(page_data or [])
+        return self._diff_collections(previous, current, id_key)
+
+    def _is_paginated(self, op_id: str) -> bool:
+        """Returns true if the operation takes a `page` parameter.
+
+        Args:
+            op_id: operation id
+
+        Returns:
+            True if the operation's responses are paginated
+        """
+        operation = self._get_operation_for_op_id(op_id) or {}
+        for parameter in operation.get("parameters", []):
+            if parameter.get("name") == "page" or parameter.get("$ref", "").endswith(
+                "/page"
+            ):
+                return True
+        return False
+
+    def _diff_collections(
+        self, previous: list, current: list, id_key: Optional[str] = None
+    ) -> dict:
+        """Compares two versions of a collection of records.
+
+        Records that are plain values, like the type ids from
+        `get_universe_types`, are their own ID, so they can only be added or
+        removed.
+
+        Args:
+            previous: older list of records
+            current: newer list of records
+            id_key: name of the ID field of each record, or None to detect it
+
+        Returns:
+            dict with `added`, `removed`, and `changed` lists of records
+        """
+        if not isinstance(previous, list) or not isinstance(current, list):
+            raise ValueError("Only list responses can be compared")
+        sample = current[0] if current else previous[0] if previous else None
+        if not isinstance(sample, dict):
+            try:
+                old = {record: record for record in previous}
+                new = {record: record for record in current}
+            except TypeError:
+                raise ValueError("Records of mixed types can't be compared") from None
+        else:
+            if id_key is None:
+                id_key = next(
+                    (key for key in self.DELTA_ID_KEYS if key in sample), None
+                )
+                if id_key is None:
+                    raise ValueError("Could not determine the ID field of the records")
+            try:
+                old = {record[id_key]: record for record in previous}
+                new = {record[id_key]: record for record in current}
+            except (KeyError, TypeError):
+                raise ValueError(
+                    f"Not every record has the ID field {id_key!r}"
+                ) from None
+        return {
+            "added": [record for key, record in new.items() if key not in old],
+            "removed": [record for key, record in old.items() if key not in new],
+            "changed": [
+                record
+                for key, record in new.items()
+                if key in old and old[key] != record
+            ],
+        }
 
     def post_path(
-        self, path: str, path_data: Union[dict, None], post_data: Any
+        self,
+        path: str,
+        path_data: Union[dict, None],
+        post_data: Any,
+        route: Optional[str] = None,
     ) -> dict:
         """Modifies the ESI by an endpoint URL.
 
@@ -524,17 +1006,27 @@ class Preston:
             path: raw ESI URL path
             path_data: data to format the path with (can be None)
             post_data: data to send to ESI
+            route: operation id for the scheduler, defaults to the path
 
         Returns:
             ESI data
         """
         target_url = self._build_url(path, path_data)
         self._try_refresh_access_token()
-        return self._retry_request(self.session.post, target_url, json=post_data)
+        return self._retry_request(
+            self.session.post, target_url, route=route or path, json=post_data
+        )
 
     def post_op(self, op_id: str, path_data: Union[dict, None], post_data: Any) -> dict:
         """Modifies the ESI by looking up an operation id.
 
+        If this instance was created with `cache_post`, responses of read-only
+        POST operations (those the spec documents as returning 200 rather than
+        201 or 204, like `post_universe_names`) are cached like GET responses.
+        When the payload is a list of IDs and each returned record carries one
+        of them, records are cached per ID, so only IDs that aren't in the
+        cache yet are sent to ESI.
+
         Args:
             op_id: operation id
             path_data: data to format the path with (can be None)
@@ -544,9 +1036,117 @@ class Preston:
             ESI data
         """
         path = self._get_path_for_op_id(op_id)
-        return self.post_path(path, path_data, post_data)
+        path_data = self._validate_params(op_id, path_data)
+        if self.cache_post and self._is_read_only_post(op_id):
+            return self._post_cached(op_id, path, path_data or {}, post_data)
+        return self.post_path(path, path_data, post_data, op_id)
+
+    def _is_read_only_post(self, op_id: str) -> bool:
+        """Returns true if the spec documents the operation as read-only.
+
+        Args:
+            op_id: operation id
 
-    def delete_path(self, path: str, path_data: Union[dict, None]) -> dict:
+        Returns:
+            True if the operation returns data and doesn't create anything
+        """
+        responses = (self._get_operation_for_op_id(op_id) or {}).get("responses", {})
+        return "200" in responses and not {"201", "204"} & responses.keys()
+
+    def _post_cached(
+        self, op_id: str, path: str, path_data: dict, post_data: Any
+    ) -> Any:
+        """Sends a read-only POST request, using the cache where possible.
+
+        For a list of IDs, only the IDs that aren't cached yet are sent, and
+        the returned records are merged with the cached ones. Responses that
+        aren't a list of records are cached under the whole (normalized) body
+        instead; if some IDs were already cached, the whole body is sent, so
+        the cached IDs are never left out of the result.
+
+        Args:
+            op_id: operation id
+            path: raw ESI URL path
+            path_data: data to format the path with
+            post_data: data to send to ESI
+
+        Returns:
+            ESI data
+        """
+        target_url = self._build_url(path, path_data)
+        if isinstance(post_data, list) and all(
+            isinstance(item, (int, str)) for item in post_data
+        ):
+            post_data = sorted(set(post_data), key=lambda item: (str(type(item)), item))
+            item_keys = {
+                item: f"{target_url}#{op_id}:{json.dumps(item)}" for item in post_data
+            }
+            cached = {item: self.cache.check(key) for item, key in item_keys.items()}
+            missing = [item for item, record in cached.items() if record is None]
+            if not missing:
+                return list(cached.values())
+        else:
+            missing = post_data
+        body_key = "{}#{}:{}".format(
+            target_url,
+            op_id,
+            hashlib.sha256(
+                json.dumps(post_data, sort_keys=True).encode("utf-8")
+            ).hexdigest(),
+        )
+        cached_data = self.cache.check(body_key)
+        if cached_data is not None:
+            return cached_data
+
+        self._try_refresh_access_token()
+        data, headers, _ = self._retry_request(
+            self.session.post,
+            target_url,
+            return_metadata=True,
+            route=op_id,
+            json=missing,
+        )
+        if (
+            missing is not post_data
+            and isinstance(data, list)
+            and all(isinstance(record, dict) for record in data)
+        ):
+            requested = set(missing)
+            unmatched = []
+            for record in data:
+                item = next(
+                    (
+                        record[key]
+                        for key in self.POST_ITEM_KEYS
+                        if record.get(key) in requested
+                    ),
+                    None,
+                )
+                if item is None:
+                    unmatched.append(record)
+                    continue
+                cached[item] = record
+                self.cache.set(record, headers, item_keys[item])
+            # IDs ESI returned nothing for are left out, and stay uncached
+            return [
+                record for record in cached.values() if record is not None
+            ] + unmatched
+        if missing is not post_data and len(missing) < len(post_data):
+            # a response that isn't a list of records can't be merged with the
+            # cached records, so the whole body is sent instead
+            data, headers, _ = self._retry_request(
+                self.session.post,
+                target_url,
+                return_metadata=True,
+                route=op_id,
+                json=post_data,
+            )
+        self.cache.set(data, headers, body_key)
+        return data
+
+    def delete_path(
+        self, path: str, path_data: Union[dict, None], route: Optional[str] = None
+    ) -> dict:
         """Deletes a resource in the ESI by an endpoint URL.
 
         This method is not marked "private" as it _can_ be used
@@ -556,13 +1156,14 @@ class Preston:
         Args:
             path: raw ESI URL path
             path_data: data to format the path with (can be None)
+            route: operation id for the scheduler, defaults to the path
 
         Returns:
             ESI response data
         """
         target_url = self._build_url(path, path_data)
         self._try_refresh_access_token()
-        return self._retry_request(self.session.delete, target_url)
+        return self._retry_request(self.session.delete, target_url, route=route or path)
 
     def delete_op(self, op_id: str, path_data: Union[dict, None]) -> dict:
         """Deletes a resource in the ESI by looking up an operation id.
@@ -575,4 +1176,5 @@ class Preston:
             ESI response data
         """
         path = self._get_path_for_op_id(op_id)
-        return self.delete_path(path, path_data)
+        path_data = self._validate_params(op_id, path_data)
+        return self.delete_path(path, path_data, op_id)
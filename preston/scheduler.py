@@ -0,0 +1,229 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from fnmatch import fnmatch
+from typing import Any, Hashable, Iterator, Optional
+
+
+class RequestScheduler:
+    """RequestScheduler class.
+
+    Decides the order in which concurrent requests from one or more Preston
+    instances are sent. Pass the same scheduler to every instance that should
+    share it, with the `scheduler` kwarg.
+
+    Requests wait in one queue per priority class, and a lower value is always
+    served first. Inside a priority class, requests are served round-robin
+    across owners (by default, each Preston instance - so each character - is
+    its own owner), so one busy character can't starve the others.
+
+    A number of slots is reserved for `INTERACTIVE` requests, so they never
+    wait behind a background crawl that saturates the client. Background
+    requests are also held back while ESI's error limit is running low, leaving
+    what's left of it to the other priority classes.
+
+    Args:
+        max_concurrency: total number of requests allowed in flight
+        route_limits: dict of route patterns to the max number of requests in
+                      flight for matching routes; routes are operation ids for
+                      the `*_op` methods and raw paths otherwise, and patterns
+                      use `fnmatch` syntax, e.g. `get_characters_*_killmails_*`;
+                      each limit must be at least 1
+        interactive_reserve: number of slots only `INTERACTIVE` requests can use;
+                             must be lower than max_concurrency
+        background_error_floor: when ESI reports fewer errors than this left
+                                in the current window, `BACKGROUND` requests
+                                wait for the window to reset
+    """
+
+    INTERACTIVE = 0
+    NORMAL = 1
+    BACKGROUND = 2
+
+    def __init__(
+        self,
+        max_concurrency: int = 20,
+        route_limits: Optional[dict] = None,
+        interactive_reserve: int = 2,
+        background_error_floor: int = 20,
+    ) -> None:
+        if max_concurrency <= interactive_reserve:
+            raise ValueError(
+                "max_concurrency must be greater than interactive_reserve, "
+                "or only interactive requests could ever be sent"
+            )
+        for pattern, limit in (route_limits or {}).items():
+            if limit < 1:
+                raise ValueError(f"route limit for {pattern!r} must be at least 1")
+        self.max_concurrency = max_concurrency
+        self.route_limits = route_limits or {}
+        self.interactive_reserve = interactive_reserve
+        self.background_error_floor = background_error_floor
+        self.active = 0
+        self.active_by_limit: dict = {}
+        self.error_limit_remain: Optional[int] = None
+        self.error_limit_reset_at = 0.0
+        self._queues: dict = {}
+        self._condition = threading.Condition()
+
+    def _limit_for(self, route: str) -> Optional[str]:
+        """Finds the route limit pattern that applies to a route.
+
+        Args:
+            route: operation id or path
+
+        Returns:
+            matching pattern, or None if the route isn't limited
+        """
+        for pattern in self.route_limits:
+            if fnmatch(route, pattern):
+                return pattern
+        return None
+
+    def _can_start(self, priority: int, limit: Optional[str]) -> bool:
+        """Checks whether a request could start right now.
+
+        Args:
+            priority: priority class of the request
+            limit: route limit pattern of the request
+
+        Returns:
+            True if the request can be granted a slot
+        """
+        available = self.max_concurrency - self.active
+        if priority != self.INTERACTIVE:
+            available -= self.interactive_reserve
+        if available <= 0:
+            return False
+        if (
+            limit is not None
+            and self.active_by_limit.get(limit, 0) >= self.route_limits[limit]
+        ):
+            return False
+        if (
+            priority == self.BACKGROUND
+            and self.error_limit_remain is not None
+            and self.error_limit_remain < self.background_error_floor
+            and time.time() < self.error_limit_reset_at
+        ):
+            return False
+        return True
+
+    def _dispatch(self) -> None:
+        """Grants slots to waiting requests, in priority and round-robin order.
+
+        Must be called with the condition held.
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        granted = False
+        progress = True
+        while progress:
+            progress = False
+            for priority in sorted(self._queues):
+                owners = self._queues[priority]
+                for owner, tickets in list(owners.items()):
+                    # a request held back by its route limit doesn't hold back
+                    # the owner's later requests on other routes
+                    ticket = next(
+                        (
+                            ticket
+                            for ticket in tickets
+                            if self._can_start(priority, ticket["limit"])
+                        ),
+                        None,
+                    )
+                    if ticket is None:
+                        continue
+                    tickets.remove(ticket)
+                    # the owner goes to the back of the line
+                    del owners[owner]
+                    if tickets:
+                        owners[owner] = tickets
+                    self._start(ticket["limit"])
+                    ticket["granted"] = True
+                    progress = granted = True
+                if not owners:
+                    del self._queues[priority]
+        if granted:
+            self._condition.notify_all()
+
+    def _start(self, limit: Optional[str]) -> None:
+        """Marks a request as in flight.
+
+        Args:
+            limit: route limit pattern of the request
+
+        Returns:
+            None
+        """
+        self.active += 1
+        if limit is not None:
+            self.active_by_limit[limit] = self.active_by_limit.get(limit, 0) + 1
+
+    def _finish(self, limit: Optional[str]) -> None:
+        """Marks a request as no longer in flight.
+
+        Args:
+            limit: route limit pattern of the request
+
+        Returns:
+            None
+        """
+        self.active -= 1
+        if limit is not None:
+            self.active_by_limit[limit] -= 1
+
+    @contextmanager
+    def slot(
+        self, route: str, priority: int = NORMAL, owner: Hashable = None
+    ) -> Iterator[None]:
+        """Waits for a slot to send a request in, and holds it until exit.
+
+        Args:
+            route: operation id or path of the request
+            priority: priority class of the request
+            owner: key that requests are fairly queued across
+
+        Returns:
+            context manager
+        """
+        ticket = {"limit": self._limit_for(route), "granted": False}
+        with self._condition:
+            owners = self._queues.setdefault(priority, {})
+            owners.setdefault(owner, deque()).append(ticket)
+            self._dispatch()
+            while not ticket["granted"]:
+                # wake up periodically, as the error limit window can reset
+                # without any other request finishing
+                self._condition.wait(timeout=1)
+                self._dispatch()
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._finish(ticket["limit"])
+                self._dispatch()
+
+    def update_error_limit(self, headers: Any) -> None:
+        """Records ESI's error limit state from a response's headers.
+
+        Args:
+            headers: headers from ESI
+
+        Returns:
+            None
+        """
+        remain = headers.get("X-Esi-Error-Limit-Remain")
+        if remain is None:
+            return
+        reset = headers.get("X-Esi-Error-Limit-Reset", 0)
+        with self._condition:
+            self.error_limit_remain = int(remain)
+            self.error_limit_reset_at = time.time() + int(reset)
+            self._dispatch()
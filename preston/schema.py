@@ -0,0 +1,142 @@
+import re
+import warnings
+from typing import Any, Callable
+
+
+class SchemaDriftWarning(UserWarning):
+    """Warning raised when a response doesn't match the spec's schema."""
+
+
+class Record:
+    """Base class for the record types generated from the spec.
+
+    Subclasses are created by `compile_schema` with one slot per property in
+    the response schema, so instances are much smaller than the equivalent
+    dicts and support attribute access. Properties missing from a response
+    are set to None.
+    """
+
+    __slots__ = ()
+
+    def _asdict(self) -> dict:
+        """Returns the record's fields as a dict.
+
+        Args:
+            None
+
+        Returns:
+            dict of field names to values
+        """
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __eq__(self, other: Any) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return self._asdict() == other._asdict()
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{k}={v!r}" for k, v in self._asdict().items())
+        return f"{type(self).__name__}({fields})"
+
+
+def _class_name(name: str) -> str:
+    """Converts a schema title into a class name.
+
+    Args:
+        name: schema title, like `get_characters_character_id_ok`
+
+    Returns:
+        CamelCase class name
+    """
+    return "".join(part.capitalize() for part in re.split(r"\W|_", name) if part)
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+def compile_schema(schema: dict, name: str) -> Callable[[Any], Any]:
+    """Builds a decoder function for a response schema.
+
+    Objects with declared properties are decoded into generated `Record`
+    subclasses, arrays are decoded item by item, and everything else is
+    returned as-is. Keys that aren't in the schema, and required keys that are
+    missing, emit a `SchemaDriftWarning`.
+
+    Args:
+        schema: schema from the spec
+        name: fallback name for the generated type, if the schema has no title
+
+    Returns:
+        function that decodes a JSON value matching the schema
+    """
+    schema_type = schema.get("type")
+    if schema_type == "array" and "items" in schema:
+        decode_item = compile_schema(schema["items"], f"{name}_item")
+        if decode_item is _identity:
+            return _identity
+        return lambda value: [decode_item(item) for item in value]
+
+    properties = schema.get("properties")
+    if schema_type != "object" or not properties:
+        return _identity
+
+    title = schema.get("title", name)
+    fields = tuple(properties)
+    field_set = frozenset(fields)
+    required = frozenset(schema.get("required", ()))
+    decoders = [
+        (field, compile_schema(sub_schema, f"{title}_{field}"))
+        for field, sub_schema in properties.items()
+    ]
+    record_type = type(_class_name(title), (Record,), {"__slots__": fields})
+
+    def decode(value: Any) -> Any:
+        if not isinstance(value, dict):
+            return value
+        keys = value.keys()
+        if not keys <= field_set:
+            warnings.warn(
+                f"{title}: unexpected fields {sorted(keys - field_set)}",
+                SchemaDriftWarning,
+                stacklevel=2,
+            )
+        if not required <= keys:
+            warnings.warn(
+                f"{title}: missing required fields {sorted(required - keys)}",
+                SchemaDriftWarning,
+                stacklevel=2,
+            )
+        record = record_type.__new__(record_type)
+        for field, decode_field in decoders:
+            field_value = value.get(field)
+            if field_value is not None:
+                field_value = decode_field(field_value)
+            setattr(record, field, field_value)
+        return record
+
+    return decode
+
+
+def build_decoders(spec: dict, methods: list[str]) -> dict:
+    """Builds response decoders for every operation in the spec.
+
+    Args:
+        spec: OpenAPI spec data
+        methods: HTTP methods to look at on each path
+
+    Returns:
+        dict of operation ids to decoder functions
+    """
+    decoders = {}
+    for path_value in spec.get("paths", {}).values():
+        for method in methods:
+            operation = path_value.get(method)
+            if not operation or "operationId" not in operation:
+                continue
+            op_id = operation["operationId"]
+            response = operation.get("responses", {}).get("200", {})
+            schema = response.get("schema")
+            if schema:
+                decoders[op_id] = compile_schema(schema, f"{op_id}_ok")
+    return decoders
@@ -0,0 +1,188 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Any, Callable, Iterator, Optional
+
+
+class Tracer:
+    """Tracer class.
+
+    The default tracer: every span is a no-op, so tracing costs nothing
+    beyond a method call when it isn't used.
+    """
+
+    _NULL_SPAN = nullcontext()
+
+    def span(self, name: str, **attributes: Any) -> Any:
+        """Returns a context manager that times a stage of a request.
+
+        Args:
+            name: name of the stage
+            attributes: extra information about the stage
+
+        Returns:
+            context manager
+        """
+        return self._NULL_SPAN
+
+
+class SpanTracer(Tracer):
+    """SpanTracer class.
+
+    Records spans in the OpenTelemetry (OTLP JSON) span format and hands each
+    finished span to an exporter. Spans started while another span is open on
+    the same thread become its children.
+
+    Optionally, calls whose outermost span takes longer than `slow_threshold`
+    seconds are passed to `on_slow`, with the time spent in each stage.
+
+    Args:
+        exporter: callable that receives each finished span, as a dict
+        slow_threshold: duration in seconds above which a call is "slow"
+        on_slow: callable that receives the root span and a dict of stage
+                 names to the total seconds spent in them
+    """
+
+    def __init__(
+        self,
+        exporter: Optional[Callable[[dict], None]] = None,
+        slow_threshold: Optional[float] = None,
+        on_slow: Optional[Callable[[dict, dict], None]] = None,
+    ) -> None:
+        self.exporter = exporter
+        self.slow_threshold = slow_threshold
+        self.on_slow = on_slow
+        self._local = threading.local()
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[dict]:
+        """Records a span around a stage of a request.
+
+        Args:
+            name: name of the stage
+            attributes: extra information about the stage
+
+        Returns:
+            context manager yielding the span dict
+        """
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        parent = stack[-1] if stack else None
+        span = {
+            "traceId": parent["traceId"] if parent else os.urandom(16).hex(),
+            "spanId": os.urandom(8).hex(),
+            "parentSpanId": parent["spanId"] if parent else "",
+            "name": name,
+            "startTimeUnixNano": time.time_ns(),
+            "endTimeUnixNano": 0,
+            "attributes": [
+                {"key": key, "value": _attribute_value(value)}
+                for key, value in attributes.items()
+            ],
+            "status": {"code": 0},
+        }
+        stack.append(span)
+        if parent is None:
+            self._local.finished = []
+        try:
+            yield span
+        except BaseException as exc:
+            # STATUS_CODE_ERROR
+            span["status"] = {"code": 2, "message": repr(exc)}
+            raise
+        finally:
+            stack.pop()
+            span["endTimeUnixNano"] = time.time_ns()
+            self._local.finished.append(span)
+            if self.exporter is not None:
+                self.exporter(span)
+            if parent is None:
+                self._check_slow(span, self._local.finished)
+
+    def _check_slow(self, root: dict, spans: list[dict]) -> None:
+        """Reports a finished call to `on_slow` if it took too long.
+
+        Args:
+            root: outermost span of the call
+            spans: every span of the call
+
+        Returns:
+            None
+        """
+        if self.on_slow is None or self.slow_threshold is None:
+            return
+        if _duration(root) < self.slow_threshold:
+            return
+        stages: dict = {}
+        for span in spans:
+            if span is not root:
+                stages[span["name"]] = stages.get(span["name"], 0.0) + _duration(span)
+        self.on_slow(root, stages)
+
+
+class JsonLinesExporter:
+    """JsonLinesExporter class.
+
+    Local span exporter that appends each span to a file as a line of OTLP
+    JSON, ready to be shipped to a collector or inspected by hand.
+
+    Args:
+        path: path of the file to append to
+        service_name: value of the `service.name` resource attribute
+    """
+
+    def __init__(self, path: str, service_name: str = "preston") -> None:
+        self.path = path
+        self.resource = {
+            "attributes": [
+                {"key": "service.name", "value": {"stringValue": service_name}}
+            ]
+        }
+        self._lock = threading.Lock()
+
+    def __call__(self, span: dict) -> None:
+        line = json.dumps(
+            {
+                "resourceSpans": [
+                    {
+                        "resource": self.resource,
+                        "scopeSpans": [{"scope": {"name": "preston"}, "spans": [span]}],
+                    }
+                ]
+            }
+        )
+        with self._lock, open(self.path, "a") as f:
+            f.write(line + "\n")
+
+
+def _duration(span: dict) -> float:
+    """Returns the duration of a finished span in seconds.
+
+    Args:
+        span: finished span
+
+    Returns:
+        duration in seconds
+    """
+    return (span["endTimeUnixNano"] - span["startTimeUnixNano"]) / 1e9
+
+
+def _attribute_value(value: Any) -> dict:
+    """Converts a value to an OTLP attribute value.
+
+    Args:
+        value: attribute value
+
+    Returns:
+        OTLP `AnyValue` dict
+    """
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
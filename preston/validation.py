@@ -0,0 +1,182 @@
+from typing import Any, Callable
+
+
+class ParameterError(ValueError):
+    """Raised when the parameters for an operation don't match the spec."""
+
+
+def _resolve(parameter: dict, spec: dict) -> dict:
+    """Resolves a `$ref` parameter against the spec's shared parameters.
+
+    Args:
+        parameter: parameter definition, possibly a reference
+        spec: OpenAPI spec data
+
+    Returns:
+        parameter definition
+    """
+    ref = parameter.get("$ref")
+    if ref is None:
+        return parameter
+    node = spec
+    for part in ref.lstrip("#/").split("/"):
+        node = node.get(part, {})
+    return node
+
+
+def _scalar_normalizer(definition: dict, label: str) -> Callable[[Any], Any]:
+    """Builds a function that checks and normalizes a single value.
+
+    Args:
+        definition: parameter (or array items) definition from the spec
+        label: name of the parameter, for error messages
+
+    Returns:
+        function that returns the normalized value, or raises ParameterError
+    """
+    kind = definition.get("type")
+    enum = definition.get("enum")
+    minimum = definition.get("minimum")
+    maximum = definition.get("maximum")
+
+    def fail(value: Any, expected: str) -> None:
+        raise ParameterError(f"{label}: expected {expected}, got {value!r}")
+
+    def parse(value: Any, convert: Callable, types: Any, expected: str) -> Any:
+        # numeric strings, like ones read from a file, are accepted too
+        if isinstance(value, str):
+            try:
+                value = convert(value)
+            except ValueError:
+                fail(value, expected)
+        if isinstance(value, bool) or not isinstance(value, types):
+            fail(value, expected)
+        return value
+
+    def normalize(value: Any) -> Any:
+        if kind == "integer":
+            value = parse(value, int, int, "an integer")
+        elif kind == "number":
+            value = parse(value, float, (int, float), "a number")
+        elif kind == "boolean":
+            if isinstance(value, str) and value.lower() in ("true", "false"):
+                value = value.lower()
+            elif isinstance(value, bool):
+                value = "true" if value else "false"
+            else:
+                fail(value, "a boolean")
+        elif kind == "string" and not isinstance(value, str):
+            fail(value, "a string")
+        if enum is not None and value not in enum:
+            fail(value, f"one of {enum}")
+        if minimum is not None and value < minimum:
+            fail(value, f"at least {minimum}")
+        if maximum is not None and value > maximum:
+            fail(value, f"at most {maximum}")
+        return value
+
+    return normalize
+
+
+def _normalizer(definition: dict, label: str) -> Callable[[Any], Any]:
+    """Builds a function that checks and normalizes a parameter's value.
+
+    Arrays are deduplicated and sorted, so that equivalent calls build the
+    same URL, and joined according to their `collectionFormat`.
+
+    Args:
+        definition: parameter definition from the spec
+        label: name of the parameter, for error messages
+
+    Returns:
+        function that returns the normalized value, or raises ParameterError
+    """
+    if definition.get("type") != "array":
+        return _scalar_normalizer(definition, label)
+    normalize_item = _scalar_normalizer(definition.get("items", {}), label)
+    separator = {"csv": ",", "ssv": " ", "tsv": "\t", "pipes": "|"}.get(
+        definition.get("collectionFormat", "csv")
+    )
+
+    def normalize(value: Any) -> Any:
+        if isinstance(value, str):
+            value = value.split(separator or ",")
+        elif not isinstance(value, (list, tuple, set, frozenset)):
+            raise ParameterError(f"{label}: expected a list, got {value!r}")
+        items = sorted({normalize_item(item) for item in value})
+        if separator is None:
+            # "multi", sent as a repeated query parameter
+            return items
+        return separator.join(str(item) for item in items)
+
+    return normalize
+
+
+def compile_validator(
+    op_id: str, parameters: list[dict], spec: dict
+) -> Callable[[dict], dict]:
+    """Builds a validator for an operation's path and query parameters.
+
+    Args:
+        op_id: operation id
+        parameters: the operation's parameter definitions from the spec
+        spec: OpenAPI spec data, to resolve references against
+
+    Returns:
+        function that takes the data for an operation and returns it
+        normalized, or raises ParameterError
+    """
+    checks = []
+    for parameter in parameters:
+        parameter = _resolve(parameter, spec)
+        if parameter.get("in") not in ("path", "query"):
+            continue
+        name = parameter["name"]
+        checks.append(
+            (
+                name,
+                parameter.get("required", False),
+                _normalizer(parameter, f"{op_id}.{name}"),
+            )
+        )
+    names = frozenset(name for name, _, _ in checks)
+
+    def validate(data: dict) -> dict:
+        unknown = data.keys() - names
+        if unknown:
+            raise ParameterError(f"{op_id}: unknown parameters {sorted(unknown)}")
+        normalized = {}
+        for name, required, normalize in checks:
+            value = data.get(name)
+            if value is None:
+                if required:
+                    raise ParameterError(f"{op_id}: missing parameter {name!r}")
+                continue
+            normalized[name] = normalize(value)
+        return normalized
+
+    return validate
+
+
+def build_validators(spec: dict, methods: list[str]) -> dict:
+    """Builds parameter validators for every operation in the spec.
+
+    Args:
+        spec: OpenAPI spec data
+        methods: HTTP methods to look at on each path
+
+    Returns:
+        dict of operation ids to validator functions
+    """
+    validators = {}
+    for path_value in spec.get("paths", {}).values():
+        shared = path_value.get("parameters", [])
+        for method in methods:
+            operation = path_value.get(method)
+            if not operation or "operationId" not in operation:
+                continue
+            op_id = operation["operationId"]
+            validators[op_id] = compile_validator(
+                op_id, shared + operation.get("parameters", []), spec
+            )
+    return validators
@@ -0,0 +1,8 @@
+import pytest
+
+from preston import Preston
+
+
+@pytest.fixture
+def empty():
+    return Preston()
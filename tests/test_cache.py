@@ -1,10 +1,11 @@
-from time import sleep
+import struct
+from time import sleep, time
 from datetime import datetime, timedelta, UTC
 
 import pytest
 
 from preston.preston import Preston
-from preston.cache import Cache
+from preston.cache import Cache, SharedCache
 
 
 @pytest.fixture
@@ -91,3 +92,107 @@ def test_add_verify_page(cache):
     sleep(1)
     assert not cache.check(Preston.BASE_URL + "/test2")
     assert len(cache) == 2
+
+
+@pytest.mark.parametrize(
+    "kwargs, payload_type",
+    [({}, list), ({"compact": True}, bytes), ({"compress": True}, bytes)],
+)
+def test_compact_storage(kwargs, payload_type):
+    cache = Cache(**kwargs)
+    headers = {
+        "expires": (datetime.now(UTC) + timedelta(seconds=300)).strftime(
+            "%a, %d %b %Y %H:%M:%S GMT"
+        )
+    }
+    data = [{"order_id": 1, "price": 2.5}, {"order_id": 2, "price": 3.0}]
+    cache.set(data, headers, "url")
+    assert isinstance(cache.data["url"].payload, payload_type)
+    assert cache.check("url") == data
+    assert not hasattr(cache.data["url"], "__dict__")
+
+
+@pytest.mark.parametrize("dump_kwargs", [{}, {"compact": True}, {"compress": True}])
+@pytest.mark.parametrize("load_kwargs", [{}, {"compress": True}])
+def test_snapshot_roundtrip(tmp_path, dump_kwargs, load_kwargs):
+    source = Cache(**dump_kwargs)
+    headers = {
+        "expires": (datetime.now(UTC) + timedelta(seconds=300)).strftime(
+            "%a, %d %b %Y %H:%M:%S GMT"
+        ),
+        "etag": '"abc"',
+        "x-pages": "3",
+    }
+    source.set([{"order_id": 1}], headers, "fresh")
+    source.set({"foo": "bar"}, {}, "expired")
+    source.data["expired"].expires_after = 0
+    path = str(tmp_path / "cache.bin")
+    assert source.dump(path) == 1
+
+    target = Cache(**load_kwargs)
+    assert target.load(path) == 1
+    entry = target.data["fresh"]
+    assert entry.etag == '"abc"'
+    assert entry.pages == 3
+    assert entry.expires_after == source.data["fresh"].expires_after
+    assert entry.encoding == target.encoding
+    assert target.check("fresh") == [{"order_id": 1}]
+    assert "expired" not in target.data
+
+
+def test_snapshot_drops_entries_expired_on_load(tmp_path, cache):
+    cache.set({"foo": "bar"}, {}, "url")
+    cache.data["url"].expires_after = time() + 0.5
+    path = str(tmp_path / "cache.bin")
+    assert cache.dump(path) == 1
+    sleep(0.6)
+    assert Cache().load(path) == 0
+
+
+def test_snapshot_bad_file(tmp_path, cache):
+    path = tmp_path / "cache.bin"
+    path.write_bytes(b"nope")
+    with pytest.raises(ValueError):
+        cache.load(str(path))
+
+
+@pytest.mark.parametrize("expired", [False, True])
+@pytest.mark.parametrize("cut", [1, 15, 20])
+def test_snapshot_truncated(tmp_path, cache, expired, cut):
+    headers = {
+        "expires": (datetime.now(UTC) + timedelta(seconds=300)).strftime(
+            "%a, %d %b %Y %H:%M:%S GMT"
+        ),
+        "etag": '"abcd"',
+    }
+    cache.set({"foo": "bar"}, headers, "url")
+    path = tmp_path / "cache.bin"
+    cache.dump(str(path))
+    snapshot = bytearray(path.read_bytes())
+    if expired:
+        # expires_after is the record's second field
+        offset = len(Cache.SNAPSHOT_MAGIC) + 8
+        snapshot[offset : offset + 8] = struct.pack("<d", 0.0)
+    # cuts into the payload, the etag, and the url
+    path.write_bytes(bytes(snapshot[:-cut]))
+    with pytest.raises(ValueError, match="Truncated cache snapshot"):
+        Cache().load(str(path))
+
+
+def test_shared_cache(tmp_path):
+    headers = {
+        "expires": (datetime.now(UTC) + timedelta(seconds=300)).strftime(
+            "%a, %d %b %Y %H:%M:%S GMT"
+        ),
+        "x-pages": "3",
+    }
+    first = SharedCache(str(tmp_path))
+    second = SharedCache(str(tmp_path), compress=True)
+    assert second.check("url") is None
+    first.set({"foo": "bar"}, headers, "url")
+    assert second.check("url") == {"foo": "bar"}
+    assert second.pages("url") == 3
+    assert second.data["url"].encoding == "zlib"
+
+    first.set({"foo": "old"}, {}, "expired")
+    assert second.check("expired") is None
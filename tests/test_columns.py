@@ -0,0 +1,133 @@
+from array import array
+
+import pytest
+
+from preston.columns import column_typecodes, to_columns
+
+SCHEMA = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "properties": {
+            "order_id": {"type": "integer", "format": "int64"},
+            "volume_remain": {"type": "integer", "format": "int32"},
+            "price": {"type": "number", "format": "double"},
+            "is_buy_order": {"type": "boolean"},
+            "range": {"type": "string"},
+            "min_volume": {"type": "integer", "format": "int32"},
+        },
+    },
+}
+
+PAGES = [
+    [
+        {
+            "order_id": 1,
+            "volume_remain": 10,
+            "price": 1.5,
+            "is_buy_order": True,
+            "range": "station",
+            "min_volume": 1,
+        }
+    ],
+    [
+        {
+            "order_id": 2,
+            "volume_remain": 20,
+            "price": 2.5,
+            "is_buy_order": False,
+            "range": "region",
+        }
+    ],
+]
+
+
+def test_column_typecodes():
+    assert column_typecodes(SCHEMA) == {
+        "order_id": "q",
+        "volume_remain": "i",
+        "price": "d",
+        "is_buy_order": "b",
+        "range": None,
+        "min_volume": "i",
+    }
+
+
+def test_to_columns_array():
+    columns = to_columns(PAGES, column_typecodes(SCHEMA), use_numpy=False)
+    assert columns["order_id"] == array("q", [1, 2])
+    assert columns["price"] == array("d", [1.5, 2.5])
+    assert columns["is_buy_order"] == array("b", [1, 0])
+    assert columns["range"] == ["station", "region"]
+    assert columns["min_volume"] == [1, None]
+
+
+def test_to_columns_out_of_range():
+    columns = to_columns([[{"a": 1}], [{"a": 2**40}]], {"a": "i"}, use_numpy=False)
+    assert columns["a"] == [1, 2**40]
+
+
+def test_to_columns_numpy():
+    numpy = pytest.importorskip("numpy")
+    columns = to_columns(PAGES, column_typecodes(SCHEMA), use_numpy=True)
+    assert columns["order_id"].dtype == numpy.int64
+    assert columns["price"].sum() == 4.0
+    assert list(columns["range"]) == ["station", "region"]
+
+
+def test_get_op_columns(empty):
+    empty.spec = {
+        "paths": {
+            "/orders/": {
+                "get": {
+                    "operationId": "get_orders",
+                    "parameters": [{"$ref": "#/parameters/page"}],
+                    "responses": {"200": {"schema": SCHEMA}},
+                }
+            }
+        }
+    }
+
+    def fake_request(function, url, **kwargs):
+        page = int(url.rsplit("page=", 1)[1])
+        return PAGES[page - 1], {"x-pages": "2"}, url
+
+    empty._retry_request = fake_request
+    columns = empty.get_op_columns("get_orders", use_numpy=False)
+    assert columns["order_id"] == array("q", [1, 2])
+    assert len(empty.cache) == 0
+
+    columns = empty.get_op_columns("get_orders", use_numpy=False, cache=True)
+    assert columns["order_id"] == array("q", [1, 2])
+    assert len(empty.cache) == 2
+
+
+def test_get_op_columns_not_paginated(empty):
+    empty.spec = {
+        "paths": {
+            "/markets/{region_id}/history/": {
+                "get": {
+                    "operationId": "get_markets_region_id_history",
+                    "parameters": [{"name": "type_id", "in": "query"}],
+                    "responses": {"200": {"schema": SCHEMA}},
+                }
+            }
+        }
+    }
+    urls = []
+
+    def fake_request(function, url, **kwargs):
+        urls.append(url)
+        return PAGES[0], {"x-pages": "2"}, url
+
+    empty._retry_request = fake_request
+    columns = empty.get_op_columns(
+        "get_markets_region_id_history", use_numpy=False, region_id=1, type_id=2
+    )
+    assert columns["order_id"] == array("q", [1])
+    assert urls == [
+        empty._build_url(
+            "/markets/{region_id}/history/", {"region_id": 1, "type_id": 2}
+        )
+    ]
+    assert "page" not in urls[0]
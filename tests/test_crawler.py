@@ -0,0 +1,162 @@
+import json
+import multiprocessing
+import time
+
+import pytest
+
+from preston import Preston, crawler
+from preston.cache import SharedCache
+from preston.crawler import CrawlError, SharedErrorBudget, crawl
+
+
+@pytest.fixture
+def preston():
+    preston = Preston(compact_cache=True)
+    preston.spec = {
+        "paths": {
+            "/universe/types/{type_id}/": {
+                "get": {"operationId": "get_universe_types_type_id"}
+            }
+        }
+    }
+    headers = {"expires": "Thu, 01 Jan 2099 00:00:00 GMT"}
+    for type_id in range(1, 5):
+        preston.cache.set(
+            {"type_id": type_id},
+            headers,
+            f"{Preston.BASE_URL}/universe/types/{type_id}/",
+        )
+    return preston
+
+
+def jobs():
+    return [("get_universe_types_type_id", {"type_id": i}) for i in range(1, 5)]
+
+
+def test_crawl_results(preston):
+    results = crawl(preston, jobs(), processes=2)
+    assert results == [{"type_id": i} for i in range(1, 5)]
+
+
+def test_crawl_decodes_results_once():
+    preston = Preston()
+    preston.spec = {
+        "paths": {
+            "/universe/types/{type_id}/": {
+                "get": {"operationId": "get_universe_types_type_id"}
+            }
+        }
+    }
+    url = f"{Preston.BASE_URL}/universe/types/1/"
+    preston.cache.set({"type_id": 1}, {"expires": "Thu, 01 Jan 2099 00:00:00 GMT"}, url)
+    results = crawl(preston, [("get_universe_types_type_id", {"type_id": 1})], 1)
+    assert results == [{"type_id": 1}]
+    assert results[0] is preston.cache.data[url].payload
+
+
+def test_crawl_sink(preston, tmp_path):
+    sink = tmp_path / "out.jsonl"
+    assert crawl(preston, jobs(), processes=2, sink=str(sink)) == 4
+    lines = [json.loads(line) for line in sink.read_text().splitlines()]
+    assert sorted(line["data"]["type_id"] for line in lines) == [1, 2, 3, 4]
+    assert all(line["op_id"] == "get_universe_types_type_id" for line in lines)
+
+
+def test_crawl_errors(preston):
+    results = crawl(
+        preston,
+        [("missing_op", {}), ("get_universe_types_type_id", {"type_id": 1})],
+        processes=1,
+    )
+    assert isinstance(results[0], CrawlError)
+    assert results[0].op_id == "missing_op"
+    assert "Unknown operation id" in results[0].message
+    assert results[1] == {"type_id": 1}
+
+
+def test_run_job_catches_any_error(preston, monkeypatch):
+    def fail(*args, **kwargs):
+        raise ValueError("boom")
+
+    monkeypatch.setattr(crawler, "_worker_preston", preston)
+    monkeypatch.setattr(preston, "get_path", fail)
+    index, result = crawler._run_job((3, ("get_universe_types_type_id", {})))
+    assert index == 3
+    assert isinstance(result, CrawlError)
+    assert "boom" in result.message
+
+
+def test_workers_share_fetched_pages(preston, tmp_path, monkeypatch):
+    remain = multiprocessing.Value("i", 100)
+    reset_at = multiprocessing.Value("d", 0.0)
+    monkeypatch.setattr(crawler, "_worker_preston", None)
+    assert SharedCache(str(tmp_path)).seed(preston.cache) == 4
+    args = ({"compact_cache": True}, preston.spec, str(tmp_path))
+    crawler._init_worker(*args, remain, reset_at, 20)
+    first = crawler._worker_preston
+    crawler._init_worker(*args, remain, reset_at, 20)
+    second = crawler._worker_preston
+    assert isinstance(second.cache, SharedCache)
+    # the seeded pages are read on demand, not loaded up front
+    assert len(second.cache) == 0
+    assert second.get_op("get_universe_types_type_id", type_id=2) == {"type_id": 2}
+    assert len(second.cache) == 1
+    url = f"{Preston.BASE_URL}/universe/types/9/"
+    headers = {"expires": "Thu, 01 Jan 2099 00:00:00 GMT"}
+    first.cache.set({"type_id": 9}, headers, url)
+    assert second.get_op("get_universe_types_type_id", type_id=9) == {"type_id": 9}
+
+
+def test_crawl_validates_params():
+    preston = Preston(compact_cache=True, validate_params=True)
+    preston.spec = {
+        "paths": {
+            "/universe/types/{type_id}/": {
+                "get": {
+                    "operationId": "get_universe_types_type_id",
+                    "parameters": [
+                        {
+                            "name": "type_id",
+                            "in": "path",
+                            "required": True,
+                            "type": "integer",
+                        }
+                    ],
+                }
+            }
+        }
+    }
+    preston.cache.set(
+        {"type_id": 1},
+        {"expires": "Thu, 01 Jan 2099 00:00:00 GMT"},
+        f"{Preston.BASE_URL}/universe/types/1/",
+    )
+    results = crawl(
+        preston,
+        [
+            ("get_universe_types_type_id", {"type_id": "1"}),
+            ("get_universe_types_type_id", {"type_id": "tritanium"}),
+            ("get_universe_types_type_id", {"type_id": 1, "page": 2}),
+        ],
+        processes=1,
+    )
+    assert results[0] == {"type_id": 1}
+    assert isinstance(results[1], CrawlError)
+    assert "expected an integer" in results[1].message
+    assert isinstance(results[2], CrawlError)
+    assert "unknown parameters" in results[2].message
+
+
+def test_shared_error_budget():
+    remain = multiprocessing.Value("i", 100)
+    reset_at = multiprocessing.Value("d", 0.0)
+    budget = SharedErrorBudget(remain, reset_at, floor=20)
+    budget.update_error_limit(
+        {"X-Esi-Error-Limit-Remain": "5", "X-Esi-Error-Limit-Reset": "0"}
+    )
+    assert remain.value == 5
+    reset_at.value = time.time() + 0.2
+    start = time.time()
+    with budget.slot("route"):
+        pass
+    assert time.time() - start >= 0.1
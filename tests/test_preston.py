@@ -1,3 +1,5 @@
+import subprocess
+import sys
 import time
 
 import pytest
@@ -5,11 +7,6 @@ import pytest
 from preston import Preston
 
 
-@pytest.fixture
-def empty():
-    return Preston()
-
-
 @pytest.fixture
 def sample():
     return Preston(
@@ -133,3 +130,256 @@ def test_try_refresh_access_token_has(empty):
     }
     empty._try_refresh_access_token()
     assert empty.access_token == "def"
+
+
+def test_session_pool_settings():
+    preston = Preston(
+        pool_connections=3, pool_maxsize=20, keep_alive=False, compression=False
+    )
+    adapter = preston.session.get_adapter(Preston.BASE_URL)
+    assert adapter._pool_connections == 3
+    assert adapter._pool_maxsize == 20
+    assert preston.session.headers["Connection"] == "close"
+    assert preston.session.headers["Accept-Encoding"] == "identity"
+
+
+def test_get_pool_stats(empty):
+    assert empty.get_pool_stats() == []
+    adapter = empty.session.get_adapter(Preston.BASE_URL)
+    adapter.poolmanager.connection_from_url(Preston.BASE_URL)
+    stats = empty.get_pool_stats()
+    assert len(stats) == 1
+    assert stats[0]["host"] == "https://esi.evetech.net:443"
+    assert stats[0]["maxsize"] == Preston.DEFAULT_POOL_MAXSIZE
+    assert stats[0]["in_use"] == 0
+    assert stats[0]["saturation"] == 0.0
+
+
+def test_diff_collections(empty):
+    previous = [
+        {"order_id": 1, "price": 1.0},
+        {"order_id": 2, "price": 2.0},
+        {"order_id": 3, "price": 3.0},
+    ]
+    current = [
+        {"order_id": 2, "price": 2.5},
+        {"order_id": 3, "price": 3.0},
+        {"order_id": 4, "price": 4.0},
+    ]
+    delta = empty._diff_collections(previous, current)
+    assert delta["added"] == [{"order_id": 4, "price": 4.0}]
+    assert delta["removed"] == [{"order_id": 1, "price": 1.0}]
+    assert delta["changed"] == [{"order_id": 2, "price": 2.5}]
+    assert empty._diff_collections([], []) == {
+        "added": [],
+        "removed": [],
+        "changed": [],
+    }
+    with pytest.raises(ValueError):
+        empty._diff_collections([], [{"foo": 1}])
+
+
+def test_diff_collections_scalars(empty):
+    delta = empty._diff_collections([1, 2, 3], [2, 3, 4])
+    assert delta == {"added": [4], "removed": [1], "changed": []}
+
+
+@pytest.mark.parametrize(
+    "previous, current, message",
+    [
+        ([{"order_id": 1}], [{"order_id": 1}, {"type_id": 2}], "'order_id'"),
+        ([{"order_id": 1}], [{"order_id": 1}, 2], "'order_id'"),
+        ([1], [2, {"order_id": 1}], "mixed types"),
+    ],
+)
+def test_diff_collections_missing_id(empty, previous, current, message):
+    with pytest.raises(ValueError, match=message):
+        empty._diff_collections(previous, current)
+
+
+def test_diff_collections_not_a_list(empty):
+    with pytest.raises(ValueError, match="list"):
+        empty._diff_collections({"a": 1}, {"a": 2})
+
+
+def test_get_op_delta(empty):
+    empty.spec = {"paths": {"/orders/": {"get": {"operationId": "get_orders"}}}}
+    url = Preston.BASE_URL + "/orders/"
+    empty.cache.set([{"order_id": 1, "price": 1.0}], {}, url)
+    empty._retry_request = lambda *args, **kwargs: (
+        [{"order_id": 1, "price": 2.0}, {"order_id": 2, "price": 1.0}],
+        {},
+        url,
+    )
+    delta = empty.get_op_delta("get_orders")
+    assert delta["added"] == [{"order_id": 2, "price": 1.0}]
+    assert delta["removed"] == []
+    assert delta["changed"] == [{"order_id": 1, "price": 2.0}]
+
+
+@pytest.mark.parametrize("module", ["jwt", "cryptography", "numpy"])
+def test_import_does_not_load_heavy_modules(module):
+    code = f"import sys, preston; assert {module!r} not in sys.modules"
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_lazy_token_refresh(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("no request expected")
+
+    monkeypatch.setattr(Preston, "_retry_request", fail)
+    preston = Preston(refresh_token="abc123", access_token="def")
+    assert preston.session.headers["Authorization"] == "Bearer def"
+
+
+def test_eager_token_refresh(monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        Preston,
+        "_retry_request",
+        lambda *args, **kwargs: calls.append(1)
+        or {"access_token": "def", "expires_in": 1},
+    )
+    preston = Preston(refresh_token="abc123", eager_token_refresh=True)
+    assert calls == [1]
+    assert preston.access_token == "def"
+
+
+def test_startup_benchmark():
+    code = (
+        "import time; start = time.perf_counter(); "
+        "from preston import Preston; "
+        "[Preston(refresh_token='abc123') for _ in range(100)]; "
+        "print(time.perf_counter() - start)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], check=True, capture_output=True, text=True
+    )
+    assert float(result.stdout) < 2.0
+
+
+@pytest.fixture
+def post_cache():
+    preston = Preston(cache_post=True)
+    preston.spec = {
+        "paths": {
+            "/universe/names/": {
+                "post": {
+                    "operationId": "post_universe_names",
+                    "responses": {"200": {}},
+                }
+            },
+            "/universe/ids/": {
+                "post": {"operationId": "post_universe_ids", "responses": {"200": {}}}
+            },
+            "/universe/raw/": {
+                "post": {"operationId": "post_universe_raw", "responses": {"200": {}}}
+            },
+            "/characters/{character_id}/mail/": {
+                "post": {
+                    "operationId": "post_characters_character_id_mail",
+                    "responses": {"201": {}},
+                }
+            },
+        }
+    }
+    preston.sent = []
+    expires = {"expires": "Thu, 01 Jan 2099 00:00:00 GMT"}
+
+    def fake_request(function, url, return_metadata=False, json=None, **kwargs):
+        preston.sent.append(json)
+        if url.endswith("/universe/names/"):
+            # like ESI, IDs that don't exist are left out of the response
+            data = [{"id": i, "name": f"name {i}"} for i in json if i < 100]
+        elif url.endswith("/universe/raw/"):
+            data = [len(json)]
+        elif url.endswith("/universe/ids/"):
+            data = {"characters": [{"id": 1, "name": name} for name in json]}
+        else:
+            data = 5
+        return (data, expires, url) if return_metadata else data
+
+    preston._retry_request = fake_request
+    return preston
+
+
+def test_post_op_cached_per_item(post_cache):
+    names = post_cache.post_op("post_universe_names", None, [3, 1, 2, 1])
+    assert [record["id"] for record in names] == [1, 2, 3]
+    assert post_cache.sent == [[1, 2, 3]]
+    names = post_cache.post_op("post_universe_names", None, [2, 4])
+    assert [record["id"] for record in names] == [2, 4]
+    assert post_cache.sent == [[1, 2, 3], [4]]
+    post_cache.post_op("post_universe_names", None, [4, 3])
+    assert len(post_cache.sent) == 2
+
+
+def test_post_op_merges_partial_response(post_cache):
+    post_cache.post_op("post_universe_names", None, [1])
+    names = post_cache.post_op("post_universe_names", None, [1, 2, 300])
+    assert [record["id"] for record in names] == [1, 2]
+    assert post_cache.sent == [[1], [2, 300]]
+    names = post_cache.post_op("post_universe_names", None, [300, 2])
+    assert [record["id"] for record in names] == [2]
+    assert post_cache.sent == [[1], [2, 300], [300]]
+
+
+def test_post_op_list_of_values(post_cache):
+    assert post_cache.post_op("post_universe_raw", None, [1, 2]) == [2]
+    assert post_cache.post_op("post_universe_raw", None, [2, 1]) == [2]
+    assert post_cache.sent == [[1, 2]]
+
+
+def test_post_op_cached_whole_body(post_cache):
+    first = post_cache.post_op("post_universe_ids", None, ["b", "a"])
+    second = post_cache.post_op("post_universe_ids", None, ["a", "b", "a"])
+    assert first == second
+    assert post_cache.sent == [["a", "b"]]
+
+
+def test_post_op_unmatched_partial_hit(post_cache):
+    url = Preston.BASE_URL + "/universe/ids/"
+    post_cache.cache.set(
+        {"characters": [{"id": 1, "name": "a"}]},
+        {"expires": "Thu, 01 Jan 2099 00:00:00 GMT"},
+        f'{url}#post_universe_ids:"a"',
+    )
+    first = post_cache.post_op("post_universe_ids", None, ["b", "a"])
+    assert [record["name"] for record in first["characters"]] == ["a", "b"]
+    assert post_cache.sent == [["b"], ["a", "b"]]
+    second = post_cache.post_op("post_universe_ids", None, ["a", "b"])
+    assert second == first
+    assert len(post_cache.sent) == 2
+
+
+def test_post_op_not_read_only(post_cache):
+    post_cache.post_op("post_characters_character_id_mail", {"character_id": 1}, {})
+    post_cache.post_op("post_characters_character_id_mail", {"character_id": 1}, {})
+    assert len(post_cache.sent) == 2
+
+
+def test_get_op_delta_paginated(empty):
+    empty.spec = {
+        "paths": {
+            "/orders/": {
+                "get": {
+                    "operationId": "get_orders",
+                    "parameters": [{"$ref": "#/parameters/page"}],
+                }
+            }
+        }
+    }
+    headers = {"expires": "Thu, 01 Jan 2099 00:00:00 GMT", "x-pages": "2"}
+    url = Preston.BASE_URL + "/orders/?page={}"
+    empty.cache.set([{"order_id": 1}], headers, url.format(1))
+    empty.cache.set([{"order_id": 2}], headers, url.format(2))
+    for entry in empty.cache.data.values():
+        entry.expires_after = 0
+    pages = {"1": [{"order_id": 2}, {"order_id": 3}], "2": [{"order_id": 1}]}
+    empty._retry_request = lambda function, target, **kwargs: (
+        pages[target.rsplit("=", 1)[1]],
+        headers,
+        target,
+    )
+    delta = empty.get_op_delta("get_orders")
+    assert delta == {"added": [{"order_id": 3}], "removed": [], "changed": []}
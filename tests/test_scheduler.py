@@ -0,0 +1,145 @@
+import threading
+import time
+
+import pytest
+
+from preston import Preston, RequestScheduler
+
+
+def run_blocked(scheduler, requests):
+    """Queues requests behind a held slot and returns the order they ran in."""
+    order = []
+    threads = []
+    with scheduler.slot("blocker", RequestScheduler.INTERACTIVE):
+        for name, route, priority, owner in requests:
+
+            def target(name=name, route=route, priority=priority, owner=owner):
+                with scheduler.slot(route, priority, owner):
+                    order.append(name)
+
+            thread = threading.Thread(target=target)
+            thread.start()
+            threads.append(thread)
+            time.sleep(0.05)
+    for thread in threads:
+        thread.join(timeout=5)
+    return order
+
+
+@pytest.fixture
+def scheduler():
+    return RequestScheduler(max_concurrency=1, interactive_reserve=0)
+
+
+def test_priority_order(scheduler):
+    order = run_blocked(
+        scheduler,
+        [
+            ("background", "a", RequestScheduler.BACKGROUND, None),
+            ("normal", "a", RequestScheduler.NORMAL, None),
+            ("interactive", "a", RequestScheduler.INTERACTIVE, None),
+        ],
+    )
+    assert order == ["interactive", "normal", "background"]
+
+
+def test_fair_across_owners(scheduler):
+    order = run_blocked(
+        scheduler,
+        [
+            ("a1", "a", RequestScheduler.NORMAL, "a"),
+            ("a2", "a", RequestScheduler.NORMAL, "a"),
+            ("a3", "a", RequestScheduler.NORMAL, "a"),
+            ("b1", "a", RequestScheduler.NORMAL, "b"),
+        ],
+    )
+    assert order.index("b1") < order.index("a3")
+
+
+def test_route_limits():
+    scheduler = RequestScheduler(route_limits={"get_killmails_*": 1})
+    with scheduler.slot("get_killmails_recent"):
+        assert not scheduler._can_start(RequestScheduler.NORMAL, "get_killmails_*")
+        assert scheduler._can_start(RequestScheduler.NORMAL, None)
+    assert scheduler._can_start(RequestScheduler.NORMAL, "get_killmails_*")
+    assert scheduler.active == 0
+
+
+def test_route_limit_does_not_block_owner():
+    scheduler = RequestScheduler(
+        max_concurrency=10, interactive_reserve=0, route_limits={"slow_*": 1}
+    )
+    order = []
+    held = threading.Event()
+
+    def slow_a():
+        with scheduler.slot("slow_a", owner="owner"):
+            held.wait(timeout=5)
+            order.append("slow_a")
+
+    def request(route):
+        with scheduler.slot(route, owner="owner"):
+            order.append(route)
+
+    threads = [threading.Thread(target=slow_a)]
+    threads[0].start()
+    time.sleep(0.05)
+    for route in ("slow_b", "fast"):
+        threads.append(threading.Thread(target=request, args=(route,)))
+        threads[-1].start()
+        time.sleep(0.05)
+    assert order == ["fast"]
+    held.set()
+    for thread in threads:
+        thread.join(timeout=5)
+    assert order == ["fast", "slow_a", "slow_b"]
+
+
+def test_interactive_reserve():
+    scheduler = RequestScheduler(max_concurrency=2, interactive_reserve=1)
+    with scheduler.slot("a", RequestScheduler.BACKGROUND):
+        assert not scheduler._can_start(RequestScheduler.BACKGROUND, None)
+        assert scheduler._can_start(RequestScheduler.INTERACTIVE, None)
+
+
+def test_error_limit_holds_background():
+    scheduler = RequestScheduler(background_error_floor=20)
+    scheduler.update_error_limit(
+        {"X-Esi-Error-Limit-Remain": "10", "X-Esi-Error-Limit-Reset": "30"}
+    )
+    assert not scheduler._can_start(RequestScheduler.BACKGROUND, None)
+    assert scheduler._can_start(RequestScheduler.INTERACTIVE, None)
+    scheduler.error_limit_reset_at = time.time() - 1
+    assert scheduler._can_start(RequestScheduler.BACKGROUND, None)
+
+
+def test_preston_sends_through_scheduler():
+    scheduler = RequestScheduler()
+    routes = []
+    original = scheduler.slot
+
+    def slot(route, priority, owner):
+        routes.append((route, priority))
+        return original(route, priority, owner)
+
+    scheduler.slot = slot
+
+    class Response:
+        headers = {"X-Esi-Error-Limit-Remain": "99", "X-Esi-Error-Limit-Reset": "5"}
+
+    preston = Preston(scheduler=scheduler, priority=RequestScheduler.BACKGROUND)
+    preston._send(lambda url, **kwargs: Response(), "url", "get_op_id")
+    assert routes == [("get_op_id", RequestScheduler.BACKGROUND)]
+    assert scheduler.error_limit_remain == 99
+
+
+def test_rejects_reserve_covering_all_slots():
+    with pytest.raises(ValueError, match="interactive_reserve"):
+        RequestScheduler(max_concurrency=2)
+    with pytest.raises(ValueError, match="interactive_reserve"):
+        RequestScheduler(max_concurrency=2, interactive_reserve=3)
+
+
+def test_rejects_route_limit_below_one():
+    with pytest.raises(ValueError, match="'x'"):
+        RequestScheduler(route_limits={"x": 0})
@@ -0,0 +1,73 @@
+import pytest
+
+from preston import Preston
+from preston.schema import Record, SchemaDriftWarning, build_decoders, compile_schema
+
+
+ORDERS_SCHEMA = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "title": "get_markets_region_id_orders_200_ok",
+        "required": ["order_id", "price"],
+        "properties": {
+            "order_id": {"type": "integer", "format": "int64"},
+            "price": {"type": "number", "format": "double"},
+            "location": {
+                "type": "object",
+                "properties": {"x": {"type": "number"}},
+            },
+        },
+    },
+}
+
+
+def test_compile_schema_records():
+    decode = compile_schema(ORDERS_SCHEMA, "get_markets_region_id_orders_ok")
+    orders = decode([{"order_id": 1, "price": 2.5, "location": {"x": 1.0}}])
+    assert len(orders) == 1
+    order = orders[0]
+    assert isinstance(order, Record)
+    assert type(order).__name__ == "GetMarketsRegionIdOrders200Ok"
+    assert order.order_id == 1
+    assert order.price == 2.5
+    assert order.location.x == 1.0
+    assert order._asdict()["order_id"] == 1
+    assert not hasattr(order, "__dict__")
+
+
+def test_compile_schema_missing_optional():
+    decode = compile_schema(ORDERS_SCHEMA, "orders")
+    order = decode([{"order_id": 1, "price": 2.5}])[0]
+    assert order.location is None
+
+
+def test_compile_schema_drift():
+    decode = compile_schema(ORDERS_SCHEMA, "orders")
+    with pytest.warns(SchemaDriftWarning, match="unexpected"):
+        decode([{"order_id": 1, "price": 2.5, "new_field": True}])
+    with pytest.warns(SchemaDriftWarning, match="missing"):
+        decode([{"order_id": 1}])
+
+
+def test_compile_schema_passthrough():
+    decode = compile_schema({"type": "array", "items": {"type": "integer"}}, "ids")
+    assert decode([1, 2, 3]) == [1, 2, 3]
+
+
+def test_typed_get_op():
+    preston = Preston(typed_responses=True)
+    preston.spec = {
+        "paths": {
+            "/orders/": {
+                "get": {
+                    "operationId": "get_orders",
+                    "responses": {"200": {"schema": ORDERS_SCHEMA}},
+                }
+            }
+        }
+    }
+    assert set(build_decoders(preston.spec, Preston.METHODS)) == {"get_orders"}
+    preston.get_path = lambda path, data, route=None: [{"order_id": 5, "price": 1.0}]
+    orders = preston.get_op("get_orders")
+    assert orders[0].order_id == 5
@@ -0,0 +1,101 @@
+import json
+
+import pytest
+
+from preston import JsonLinesExporter, Preston, SpanTracer, Tracer
+
+
+@pytest.fixture
+def spans():
+    return []
+
+
+@pytest.fixture
+def traced(spans):
+    preston = Preston(tracer=SpanTracer(exporter=spans.append))
+    preston.spec = {"paths": {"/status/": {"get": {"operationId": "get_status"}}}}
+    preston._send = lambda *args, **kwargs: Response()
+    return preston
+
+
+class Response:
+    headers = {}
+    url = Preston.BASE_URL + "/status/"
+    text = "{}"
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {"players": 1}
+
+
+def test_noop_tracer():
+    tracer = Tracer()
+    with tracer.span("a", foo=1) as span:
+        assert span is None
+    assert isinstance(Preston().tracer, Tracer)
+
+
+def test_get_op_stages(traced, spans):
+    assert traced.get_op("get_status") == {"players": 1}
+    names = [span["name"] for span in spans]
+    assert names == [
+        "preston.operation_lookup",
+        "preston.validate_params",
+        "preston.build_url",
+        "preston.cache_check",
+        "preston.token_refresh",
+        "preston.json_decode",
+        "preston.cache_write",
+        "preston.get_path",
+        "preston.get_op",
+    ]
+    root = spans[-1]
+    assert root["parentSpanId"] == ""
+    assert root["attributes"] == [
+        {"key": "op_id", "value": {"stringValue": "get_status"}}
+    ]
+    assert all(span["traceId"] == root["traceId"] for span in spans)
+    get_path = spans[-2]
+    assert spans[0]["parentSpanId"] == root["spanId"]
+    assert spans[2]["parentSpanId"] == get_path["spanId"]
+
+
+def test_span_error_status(spans):
+    tracer = SpanTracer(exporter=spans.append)
+    with pytest.raises(ValueError), tracer.span("a"):
+        raise ValueError("boom")
+    assert spans[0]["status"]["code"] == 2
+
+
+def test_slow_call_hook():
+    slow = []
+    tracer = SpanTracer(
+        slow_threshold=0, on_slow=lambda root, stages: slow.append((root, stages))
+    )
+    with tracer.span("root"):
+        with tracer.span("stage"):
+            pass
+        with tracer.span("stage"):
+            pass
+    assert len(slow) == 1
+    root, stages = slow[0]
+    assert root["name"] == "root"
+    assert list(stages) == ["stage"]
+
+    tracer.slow_threshold = 60
+    with tracer.span("root"):
+        pass
+    assert len(slow) == 1
+
+
+def test_json_lines_exporter(tmp_path):
+    path = tmp_path / "spans.jsonl"
+    tracer = SpanTracer(exporter=JsonLinesExporter(str(path)))
+    with tracer.span("root", cached=True):
+        pass
+    line = json.loads(path.read_text())
+    span = line["resourceSpans"][0]["scopeSpans"][0]["spans"][0]
+    assert span["name"] == "root"
+    assert span["attributes"][0]["value"] == {"boolValue": True}
@@ -0,0 +1,142 @@
+import pytest
+
+from preston import ParameterError, Preston
+from preston.validation import build_validators, compile_validator
+
+SPEC = {
+    "parameters": {
+        "datasource": {
+            "name": "datasource",
+            "in": "query",
+            "type": "string",
+            "enum": ["tranquility"],
+            "default": "tranquility",
+        },
+    },
+    "paths": {
+        "/markets/{region_id}/orders/": {
+            "get": {
+                "operationId": "get_markets_region_id_orders",
+                "parameters": [
+                    {"$ref": "#/parameters/datasource"},
+                    {
+                        "name": "region_id",
+                        "in": "path",
+                        "required": True,
+                        "type": "integer",
+                        "format": "int32",
+                    },
+                    {
+                        "name": "order_type",
+                        "in": "query",
+                        "required": True,
+                        "type": "string",
+                        "enum": ["buy", "sell", "all"],
+                    },
+                    {
+                        "name": "page",
+                        "in": "query",
+                        "type": "integer",
+                        "minimum": 1,
+                    },
+                    {
+                        "name": "type_ids",
+                        "in": "query",
+                        "type": "array",
+                        "items": {"type": "integer"},
+                        "collectionFormat": "csv",
+                    },
+                    {"name": "strict", "in": "query", "type": "boolean"},
+                    {"name": "If-None-Match", "in": "header", "type": "string"},
+                ],
+            }
+        }
+    },
+}
+
+
+@pytest.fixture
+def validate():
+    return build_validators(SPEC, Preston.METHODS)["get_markets_region_id_orders"]
+
+
+def test_normalizes(validate):
+    assert validate(
+        {
+            "region_id": "10000002",
+            "order_type": "sell",
+            "type_ids": [35, 34, 35],
+            "strict": True,
+            "datasource": "tranquility",
+        }
+    ) == {
+        "datasource": "tranquility",
+        "region_id": 10000002,
+        "order_type": "sell",
+        "type_ids": "34,35",
+        "strict": "true",
+    }
+    assert (
+        validate({"region_id": 1, "order_type": "all", "type_ids": "35,34"})["type_ids"]
+        == "34,35"
+    )
+
+
+@pytest.mark.parametrize(
+    "data, message",
+    [
+        ({"order_type": "sell"}, "missing parameter 'region_id'"),
+        ({"region_id": 1, "order_type": "sell", "regoin": 1}, "unknown"),
+        ({"region_id": "abc", "order_type": "sell"}, "expected an integer"),
+        ({"region_id": True, "order_type": "sell"}, "expected an integer"),
+        ({"region_id": "--5", "order_type": "sell"}, "orders.region_id: expected"),
+        ({"region_id": "\u00b2", "order_type": "sell"}, "expected an integer"),
+        ({"region_id": 1, "order_type": "both"}, "expected one of"),
+        ({"region_id": 1, "order_type": "all", "page": 0}, "at least 1"),
+        ({"region_id": 1, "order_type": "all", "strict": "yes"}, "a boolean"),
+        ({"region_id": 1, "order_type": "all", "type_ids": 34}, "a list"),
+        ({"region_id": 1, "order_type": "all", "If-None-Match": "x"}, "unknown"),
+    ],
+)
+def test_rejects(validate, data, message):
+    with pytest.raises(ParameterError, match=message):
+        validate(data)
+
+
+def test_number_parameter():
+    validate = compile_validator(
+        "op", [{"name": "price", "in": "query", "type": "number"}], {}
+    )
+    assert validate({"price": "2.5"}) == {"price": 2.5}
+    assert validate({"price": 3}) == {"price": 3}
+    with pytest.raises(ParameterError, match="op.price: expected a number"):
+        validate({"price": "cheap"})
+
+
+def test_compile_validator_without_parameters():
+    assert compile_validator("op", [], {})({}) == {}
+
+
+def test_get_op_validates():
+    preston = Preston(validate_params=True)
+    preston.spec = SPEC
+    urls = []
+    preston.get_path = lambda path, data, route=None: urls.append(
+        preston._build_url(path, data)
+    )
+    with pytest.raises(ParameterError):
+        preston.get_op("get_markets_region_id_orders", region_id=1)
+    assert urls == []
+    preston.get_op(
+        "get_markets_region_id_orders",
+        region_id=1,
+        order_type="all",
+        type_ids=[2, 1],
+    )
+    preston.get_op(
+        "get_markets_region_id_orders",
+        region_id="1",
+        order_type="all",
+        type_ids=[1, 2, 2],
+    )
+    assert urls[0] == urls[1]